@@ -0,0 +1,44 @@
+"""cat facts full text search
+
+Revision ID: 5c2d9e4b7a10
+Revises: 877ef1c3d17c
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "5c2d9e4b7a10"
+down_revision: Union[str, Sequence[str], None] = "877ef1c3d17c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "cat_facts",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', text)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_cat_facts_search_vector",
+        "cat_facts",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_cat_facts_search_vector", table_name="cat_facts", postgresql_using="gin")
+    op.drop_column("cat_facts", "search_vector")
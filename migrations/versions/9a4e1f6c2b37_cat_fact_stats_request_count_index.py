@@ -0,0 +1,26 @@
+"""cat fact stats request count index
+
+Revision ID: 9a4e1f6c2b37
+Revises: 5c2d9e4b7a10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4e1f6c2b37"
+down_revision: Union[str, Sequence[str], None] = "5c2d9e4b7a10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_cat_fact_stats_request_count", "cat_fact_stats", ["request_count"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_cat_fact_stats_request_count", table_name="cat_fact_stats")
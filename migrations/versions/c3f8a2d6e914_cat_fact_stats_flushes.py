@@ -0,0 +1,36 @@
+"""cat fact stats flushes
+
+Revision ID: c3f8a2d6e914
+Revises: 9a4e1f6c2b37
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f8a2d6e914"
+down_revision: Union[str, Sequence[str], None] = "9a4e1f6c2b37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "cat_fact_stats_flushes",
+        sa.Column("flush_id", sa.String(length=32), nullable=False),
+        sa.Column("applied_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("flush_id"),
+    )
+    op.create_index(
+        op.f("ix_cat_fact_stats_flushes_applied_at"), "cat_fact_stats_flushes", ["applied_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_cat_fact_stats_flushes_applied_at"), table_name="cat_fact_stats_flushes")
+    op.drop_table("cat_fact_stats_flushes")
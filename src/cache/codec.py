@@ -0,0 +1,161 @@
+import json
+import logging
+import zlib
+from typing import Any
+
+from src.settings import settings
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional dependency
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+# Encoded entries start with MAGIC, which is never the first byte of UTF-8 JSON text,
+# so values written before the codec was introduced are still decoded as plain JSON.
+MAGIC = b"\xc1"
+FORMAT_VERSION = 1
+HEADER_SIZE = 4  # magic, format version, codec id, compression id
+
+
+class JsonCodec:
+    id = 1
+    name = "json"
+
+    def dumps(self, value) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes):
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    id = 2
+    name = "orjson"
+
+    def dumps(self, value) -> bytes:
+        return orjson.dumps(value)
+
+    def loads(self, data: bytes):
+        return orjson.loads(data)
+
+
+class MsgpackCodec:
+    id = 3
+    name = "msgpack"
+
+    def dumps(self, value) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes):
+        return msgpack.unpackb(data, raw=False)
+
+
+class NoCompression:
+    id = 0
+    name = "none"
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCompression:
+    id = 1
+    name = "zlib"
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, settings.cache_compression_level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class Lz4Compression:
+    id = 2
+    name = "lz4"
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4_frame.decompress(data)
+
+
+# Only codecs whose dependency is installed are registered
+CODECS = {codec.id: codec for codec in (JsonCodec(),)}
+if orjson is not None:
+    CODECS[OrjsonCodec.id] = OrjsonCodec()
+if msgpack is not None:
+    CODECS[MsgpackCodec.id] = MsgpackCodec()
+
+COMPRESSIONS = {compression.id: compression for compression in (NoCompression(), ZlibCompression())}
+if lz4_frame is not None:
+    COMPRESSIONS[Lz4Compression.id] = Lz4Compression()
+
+
+# settings.cache_codec value selecting bare JSON without the header
+LEGACY_CODEC = "legacy"
+
+
+def _by_name(registry: dict, name: str, default):
+    for item in registry.values():
+        if item.name == name:
+            return item
+    logger.warning(f"[CACHE][CODEC] '{name}' is not available, falling back to '{default.name}'")
+    return default
+
+
+class CacheSerializer:
+    """Encodes cache values as: header + (optionally compressed) codec payload."""
+
+    def __init__(self, codec: str, compression: str, threshold: int, legacy: bool = False):
+        # legacy: write bare JSON so workers without the codec can still read new entries
+        self.legacy = legacy or codec == LEGACY_CODEC
+        # "legacy" is a write mode, not a registered codec; JSON backs it without a lookup warning
+        self.codec = CODECS[JsonCodec.id] if self.legacy else _by_name(CODECS, codec, CODECS[JsonCodec.id])
+        self.compression = _by_name(COMPRESSIONS, compression, COMPRESSIONS[NoCompression.id])
+        self.threshold = threshold
+
+    def dumps(self, value) -> bytes:
+        if self.legacy:
+            return json.dumps(value).encode("utf-8")
+
+        payload = self.codec.dumps(value)
+        compression = COMPRESSIONS[NoCompression.id]
+        if len(payload) >= self.threshold:
+            compression = self.compression
+            payload = compression.compress(payload)
+
+        return MAGIC + bytes((FORMAT_VERSION, self.codec.id, compression.id)) + payload
+
+    def loads(self, data: bytes | str) -> Any:
+        if isinstance(data, str) or not data.startswith(MAGIC):
+            return json.loads(data)
+
+        version, codec_id, compression_id = data[1], data[2], data[3]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache format version: {version}")
+
+        payload = COMPRESSIONS[compression_id].decompress(data[HEADER_SIZE:])
+        return CODECS[codec_id].loads(payload)
+
+
+serializer = CacheSerializer(
+    codec=settings.cache_codec,
+    compression=settings.cache_compression,
+    threshold=settings.cache_compression_threshold,
+)
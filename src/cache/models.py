@@ -1,7 +1,15 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CacheItem(BaseModel):
     key: str
     value: str
     ttl: int | None = None
+
+
+class CacheBatchSet(BaseModel):
+    items: list[CacheItem] = Field(..., min_length=1)
+
+
+class CacheBatchGet(BaseModel):
+    keys: list[str] = Field(..., min_length=1)
@@ -3,8 +3,8 @@ import logging
 import sentry_sdk
 from fastapi import APIRouter, HTTPException
 
-from src.cache.models import CacheItem
-from src.cache.service import cache_get, cache_set
+from src.cache.models import CacheBatchGet, CacheBatchSet, CacheItem
+from src.cache.service import cache_get, cache_mget, cache_mset, cache_set, get_cache_stats
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +39,45 @@ async def get_cache(key: str):
 
         logger.info("[CACHE][GET] get cache OK")
         return {"key": key, "value": value}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"[CACHE][GET] error: {e}")
         sentry_sdk.capture_exception(e)
         raise HTTPException(status_code=500, detail="Cache get error")
+
+
+@router.post("/mset")
+async def mset_cache(batch: CacheBatchSet):
+    try:
+        logger.info(f"[CACHE][MSET] Set {len(batch.items)} cache items")
+
+        await cache_mset([(item.key, item.value, item.ttl) for item in batch.items])
+
+        logger.info("[CACHE][MSET] cache stored OK")
+
+        return {"status": "saved", "keys": [item.key for item in batch.items]}
+    except Exception as e:
+        logger.error(f"[CACHE][MSET] error: {e}")
+        sentry_sdk.capture_exception(e)
+        raise HTTPException(status_code=500, detail="Cache mset error")
+
+
+@router.post("/mget")
+async def mget_cache(batch: CacheBatchGet):
+    try:
+        logger.info(f"[CACHE][MGET] get {len(batch.keys)} cache items")
+        values = await cache_mget(batch.keys)
+
+        logger.info(f"[CACHE][MGET] get cache OK ({len(values)} found)")
+        return {"values": values, "missing": [key for key in dict.fromkeys(batch.keys) if key not in values]}
+    except Exception as e:
+        logger.error(f"[CACHE][MGET] error: {e}")
+        sentry_sdk.capture_exception(e)
+        raise HTTPException(status_code=500, detail="Cache mget error")
+
+
+@router.get("/stats")
+async def cache_stats():
+    logger.info("[CACHE][STATS] get cache stats")
+    return get_cache_stats()
@@ -1,14 +1,417 @@
+import asyncio
 import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable
 
+from src.cache.codec import serializer
+from src.cache.utils import LRUCache, SingleFlight
 from src.core.redis_client import get_redis
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Marks values stored by cache_set_swr; holds the soft expiry as a unix timestamp
+SWR_MARKER = "__swr_soft_expires_at__"
+
+_single_flight = SingleFlight()
+_background_tasks: set[asyncio.Task] = set()
+
+# L1: in-process LRU in front of Redis (L2); holds serialized payloads
+local_cache = LRUCache(settings.cache_l1_max_size)
+cache_stats = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+
+# Identifies this process so it can skip its own invalidation messages
+_instance_id = uuid.uuid4().hex
+_invalidation_task: asyncio.Task | None = None
+
+
+def _l1_ttl(ttl_ms: int | None) -> float:
+    """L1 entries never outlive the Redis entry they were read from."""
+    l1_ttl = settings.cache_l1_TTL
+    if ttl_ms is not None and ttl_ms >= 0:
+        l1_ttl = min(l1_ttl, ttl_ms / 1000)
+    return l1_ttl
+
+
+async def _publish_invalidation(redis, keys: list[str]) -> None:
+    try:
+        message = json.dumps({"origin": _instance_id, "keys": keys})
+        await redis.publish(settings.cache_invalidation_channel, message)
+    except Exception as e:
+        logger.error(f"[CACHE][L1] invalidation publish error: {e}")
 
 
 async def cache_set(key: str, value, ttl: int | None = None):
     redis = get_redis()
-    await redis.set(key, json.dumps(value), ex=ttl)
+    payload = serializer.dumps(value)
+    await redis.set(key, payload, ex=ttl)
+
+    if settings.cache_l1_enabled:
+        local_cache.set(key, payload, _l1_ttl(ttl * 1000 if ttl else None))
+        await _publish_invalidation(redis, [key])
 
 
 async def cache_get(key: str):
+    if not settings.cache_l1_enabled:
+        data = await get_redis().get(key)
+        return serializer.loads(data) if data else None
+
+    data = local_cache.get(key)
+    if data is not None:
+        cache_stats["l1_hits"] += 1
+        return serializer.loads(data)
+    cache_stats["l1_misses"] += 1
+
+    async with get_redis().pipeline(transaction=False) as pipe:
+        data, ttl_ms = await pipe.get(key).pttl(key).execute()
+
+    if not data:
+        cache_stats["l2_misses"] += 1
+        return None
+
+    cache_stats["l2_hits"] += 1
+    local_cache.set(key, data, _l1_ttl(ttl_ms))
+    return serializer.loads(data)
+
+
+async def cache_mset(items: list[tuple[str, Any, int | None]]) -> None:
+    """Store many (key, value, ttl) items in one pipelined round trip."""
+    redis = get_redis()
+    payloads = [(key, serializer.dumps(value), ttl) for key, value, ttl in items]
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for key, payload, ttl in payloads:
+            pipe.set(key, payload, ex=ttl)
+        await pipe.execute()
+
+    if settings.cache_l1_enabled:
+        for key, payload, ttl in payloads:
+            local_cache.set(key, payload, _l1_ttl(ttl * 1000 if ttl else None))
+        await _publish_invalidation(redis, [key for key, _, _ in payloads])
+
+
+async def cache_mget(keys: list[str]) -> dict[str, Any]:
+    """Return the cached values for keys; missing keys are left out of the result."""
+    result: dict[str, Any] = {}
+    pending = list(dict.fromkeys(keys))
+
+    if settings.cache_l1_enabled:
+        remaining = []
+        for key in pending:
+            data = local_cache.get(key)
+            if data is None:
+                cache_stats["l1_misses"] += 1
+                remaining.append(key)
+            else:
+                cache_stats["l1_hits"] += 1
+                result[key] = serializer.loads(data)
+        pending = remaining
+
+    if not pending:
+        return result
+
+    async with get_redis().pipeline(transaction=False) as pipe:
+        pipe.mget(pending)
+        if settings.cache_l1_enabled:
+            for key in pending:
+                pipe.pttl(key)
+        values, *ttls = await pipe.execute()
+
+    for index, (key, data) in enumerate(zip(pending, values)):
+        if not data:
+            cache_stats["l2_misses"] += 1
+            continue
+        cache_stats["l2_hits"] += 1
+        if settings.cache_l1_enabled:
+            local_cache.set(key, data, _l1_ttl(ttls[index]))
+        result[key] = serializer.loads(data)
+
+    return result
+
+
+async def cache_delete(keys: list[str]) -> None:
+    """Remove keys from Redis and from every worker's L1."""
+    if not keys:
+        return
+
+    redis = get_redis()
+    await redis.delete(*keys)
+
+    if settings.cache_l1_enabled:
+        for key in keys:
+            local_cache.delete(key)
+        await _publish_invalidation(redis, keys)
+
+
+async def cache_incr(key: str) -> int:
+    """
+    Atomically increment an integer counter, e.g. the version embedded in other keys.
+    The counter is stored as a plain integer, which cache_get reads back as an int.
+    """
     redis = get_redis()
-    data = await redis.get(key)
-    return json.loads(data) if data else None
+    value = await redis.incr(key)
+
+    if settings.cache_l1_enabled:
+        local_cache.delete(key)
+        await _publish_invalidation(redis, [key])
+    return value
+
+
+def get_cache_stats() -> dict:
+    """Hit/miss counters per cache tier."""
+
+    def hit_rate(hits: int, misses: int) -> float | None:
+        total = hits + misses
+        return round(hits / total, 4) if total else None
+
+    return {
+        "l1": {
+            "enabled": settings.cache_l1_enabled,
+            "size": len(local_cache),
+            "max_size": local_cache.max_size,
+            "hits": cache_stats["l1_hits"],
+            "misses": cache_stats["l1_misses"],
+            "hit_rate": hit_rate(cache_stats["l1_hits"], cache_stats["l1_misses"]),
+        },
+        "l2": {
+            "hits": cache_stats["l2_hits"],
+            "misses": cache_stats["l2_misses"],
+            "hit_rate": hit_rate(cache_stats["l2_hits"], cache_stats["l2_misses"]),
+        },
+    }
+
+
+def _apply_invalidation(raw: str | bytes) -> None:
+    data = json.loads(raw)
+    if data.get("origin") == _instance_id:
+        return
+    for key in data.get("keys", []):
+        local_cache.delete(key)
+
+
+async def _listen_invalidations() -> None:
+    """Evict L1 entries written by other workers; reconnects on errors."""
+    while True:
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            async with pubsub:
+                await pubsub.subscribe(settings.cache_invalidation_channel)
+                logger.info("[CACHE][L1] invalidation listener subscribed")
+                async for message in pubsub.listen():
+                    _apply_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # messages may have been missed while disconnected
+            logger.error(f"[CACHE][L1] invalidation listener error: {e}")
+            local_cache.clear()
+            await asyncio.sleep(1)
+
+
+def start_invalidation_listener() -> None:
+    """
+    Start the L1 invalidation listener.
+    Should be called inside FastAPI lifespan.
+    """
+    global _invalidation_task
+
+    if settings.cache_l1_enabled and _invalidation_task is None:
+        _invalidation_task = asyncio.create_task(_listen_invalidations())
+
+
+async def stop_invalidation_listener() -> None:
+    global _invalidation_task
+
+    if _invalidation_task is None:
+        return
+
+    _invalidation_task.cancel()
+    try:
+        await _invalidation_task
+    except asyncio.CancelledError:
+        pass
+    _invalidation_task = None
+
+
+async def cache_lock_acquire(key: str, ttl: float | None = None) -> str | None:
+    """Try to take a short-lived lock for key; return its token, or None if it is held."""
+    redis = get_redis()
+    token = uuid.uuid4().hex
+    ttl_ms = int((ttl or settings.cache_lock_TTL) * 1000)
+    acquired = await redis.set(f"lock:{key}", token, nx=True, px=ttl_ms)
+    return token if acquired else None
+
+
+async def cache_lock_release(key: str, token: str) -> None:
+    """Release the lock for key only if it is still owned by token."""
+    redis = get_redis()
+    lock_key = f"lock:{key}"
+    async with redis.pipeline() as pipe:
+        await pipe.watch(lock_key)
+        current = await pipe.get(lock_key)
+        if isinstance(current, bytes):
+            current = current.decode()
+        if current != token:
+            await pipe.unwatch()
+            return
+        pipe.multi()
+        pipe.delete(lock_key)
+        await pipe.execute()
+
+
+async def cache_lock_extend(key: str, token: str, ttl: float | None = None) -> bool:
+    """Reset the expiry of a lock still owned by token; False if it was lost."""
+    redis = get_redis()
+    lock_key = f"lock:{key}"
+    ttl_ms = int((ttl or settings.cache_lock_TTL) * 1000)
+    async with redis.pipeline() as pipe:
+        await pipe.watch(lock_key)
+        current = await pipe.get(lock_key)
+        if isinstance(current, bytes):
+            current = current.decode()
+        if current != token:
+            await pipe.unwatch()
+            return False
+        pipe.multi()
+        pipe.pexpire(lock_key, ttl_ms)
+        await pipe.execute()
+    return True
+
+
+async def cache_set_swr(key: str, value, soft_ttl: int, ttl: int | None = None):
+    """
+    Store value with a soft expiry for stale-while-revalidate reads.
+    ttl is the hard upper bound after which the entry disappears from Redis.
+    """
+    envelope = {SWR_MARKER: time.time() + soft_ttl, "value": value}
+    await cache_set(key, envelope, ttl=ttl)
+
+
+def _unwrap(data) -> tuple[Any, bool]:
+    """Return (value, is_fresh) for a plain or stale-while-revalidate entry."""
+    if isinstance(data, dict) and SWR_MARKER in data:
+        return data["value"], time.time() < data[SWR_MARKER]
+    return data, True
+
+
+async def _fetch_and_store(
+    key: str,
+    fetch: Callable[[], Awaitable[Any]],
+    ttl: int | None,
+    soft_ttl: int | None = None,
+):
+    value = await fetch()
+    try:
+        if soft_ttl is not None:
+            await cache_set_swr(key, value, soft_ttl, ttl=ttl)
+        else:
+            await cache_set(key, value, ttl=ttl)
+    except Exception as e:
+        logger.error(f"[CACHE][FETCH] store error key={key}: {e}")
+    return value
+
+
+async def _fetch_with_lock(
+    key: str,
+    fetch: Callable[[], Awaitable[Any]],
+    ttl: int | None,
+    stale_key: str | None,
+    soft_ttl: int | None = None,
+):
+    """
+    Refresh key so that only one worker across the deployment hits the upstream.
+    Workers that lose the lock wait briefly for the winner, then serve stale_key.
+    """
+    try:
+        token = await cache_lock_acquire(key)
+    except Exception as e:
+        logger.error(f"[CACHE][LOCK] acquire error key={key}: {e}")
+        return await fetch()
+
+    if token:
+        try:
+            return await _fetch_and_store(key, fetch, ttl, soft_ttl)
+        finally:
+            try:
+                await cache_lock_release(key, token)
+            except Exception as e:
+                logger.error(f"[CACHE][LOCK] release error key={key}: {e}")
+
+    logger.info(f"[CACHE][LOCK] key={key} is being refreshed by another worker, waiting")
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.cache_lock_wait
+    while loop.time() < deadline:
+        await asyncio.sleep(settings.cache_lock_poll_interval)
+        data = await cache_get(key)
+        if data is not None:
+            return _unwrap(data)[0]
+
+    if stale_key:
+        value = await cache_get(stale_key)
+        if value is not None:
+            logger.info(f"[CACHE][LOCK] key={key} serving stale copy from {stale_key}")
+            return value
+
+    return await _fetch_and_store(key, fetch, ttl, soft_ttl)
+
+
+async def _revalidate(key: str, fetch: Callable[[], Awaitable[Any]], ttl: int | None, soft_ttl: int | None) -> None:
+    """Refresh a soft-expired entry; skipped when another worker already holds the lock."""
+    try:
+        token = await cache_lock_acquire(key)
+        if not token:
+            return
+        try:
+            await _fetch_and_store(key, fetch, ttl, soft_ttl)
+            logger.info(f"[CACHE][SWR] key={key} revalidated")
+        finally:
+            await cache_lock_release(key, token)
+    except Exception as e:
+        logger.error(f"[CACHE][SWR] revalidate error key={key}: {e}")
+
+
+def _schedule_revalidate(key: str, fetch: Callable[[], Awaitable[Any]], ttl: int | None, soft_ttl: int | None) -> None:
+    # own single-flight key: a miss must not join a refresh, which resolves to None
+    flight_key = f"swr:{key}"
+    if _single_flight.in_flight(flight_key):
+        return
+
+    task = asyncio.create_task(_single_flight.do(flight_key, lambda: _revalidate(key, fetch, ttl, soft_ttl)))
+    # keep a strong reference until the task finishes, otherwise it may be garbage collected
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def cache_get_or_fetch(
+    key: str,
+    fetch: Callable[[], Awaitable[Any]],
+    ttl: int | None = None,
+    stale_key: str | None = None,
+    soft_ttl: int | None = None,
+):
+    """
+    Read-through cache with miss coalescing: concurrent misses in this process share
+    one fetch, and a Redis lock lets only one worker refresh the key at a time.
+
+    With soft_ttl set the key is stored in stale-while-revalidate mode: after soft_ttl
+    the cached value is still returned immediately and refreshed in a background task,
+    until the hard ttl removes it.
+    """
+    try:
+        data = await cache_get(key)
+        if data is not None:
+            value, fresh = _unwrap(data)
+            if fresh:
+                logger.info(f"[CACHE][FETCH] HIT key={key}")
+            else:
+                logger.info(f"[CACHE][FETCH] STALE key={key}, revalidating in background")
+                _schedule_revalidate(key, fetch, ttl, soft_ttl)
+            return value
+        logger.info(f"[CACHE][FETCH] MISS key={key}")
+    except Exception as e:
+        logger.error(f"[CACHE][FETCH] cache error key={key}: {e}")
+        return await _single_flight.do(key, fetch)
+
+    return await _single_flight.do(key, lambda: _fetch_with_lock(key, fetch, ttl, stale_key, soft_ttl))
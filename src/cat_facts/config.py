@@ -13,5 +13,35 @@ class CatFactConfig:
     min_image_url_length: int = 10
     max_image_url_length: int = 500
 
+    # Listing: keyset page sizes and NDJSON export fetch size
+    page_default_limit: int = 100
+    page_max_limit: int = 1000
+    export_batch_size: int = 1000
+
+    # Full-text search: text search configuration must match the search_vector column
+    search_config: str = "english"
+    search_default_limit: int = 20
+    search_max_limit: int = 100
+
+    # Leaderboard: largest n served by /facts/top and number of facts kept in Redis
+    leaderboard_max_n: int = 100
+    leaderboard_size: int = 1000
+
+    # Response cache TTLs in seconds (entries are also invalidated on writes)
+    cache_item_TTL: int = 3600
+    cache_list_TTL: int = 300
+    cache_bounds_TTL: int = 60
+    # ids known not to exist; kept no longer than the bounds they were probed within
+    cache_missing_TTL: int = 60
+    cache_stats_TTL: int = 30
+
+    # Bulk ingestion: rows per multi-row INSERT
+    bulk_chunk_size: int = 1000
+
+    # Random fact selection: random ids probed per round trip and number of rounds
+    # before falling back to the next existing id (gaps come from deleted rows)
+    random_probe_batch_size: int = 8
+    random_probe_rounds: int = 3
+
 
 cat_fact_config = CatFactConfig()
@@ -0,0 +1,127 @@
+import logging
+from typing import Optional
+
+from src.cache.service import cache_delete, cache_get, cache_incr, cache_mget, cache_mset, cache_set
+from src.cat_facts.config import cat_fact_config as cfg
+from src.cat_facts.models import CatFactOut, CatFactPage, CatFactStatsOut
+
+logger = logging.getLogger(__name__)
+
+
+class FactCache:
+    """
+    Read-through cache of local facts on top of src.cache.
+
+    Items are stored per fact id; ids known not to exist are stored as False so
+    random probes that land in gaps do not hit the database either; those
+    entries are short-lived and dropped when the ids are created. List pages
+    embed a version that every write bumps, so stale pages are never read again
+    and simply expire. Errors are logged and reported as cache misses.
+    """
+
+    item_key: str = "cache:facts:item:{fact_id}"
+    stats_key: str = "cache:facts:stats:{fact_id}"
+    bounds_key: str = "cache:facts:bounds"
+    list_version_key: str = "cache:facts:list:version"
+    list_key: str = "cache:facts:list:v{version}:{limit}:{after}"
+
+    async def get_items(self, fact_ids: list[int]) -> dict[int, Optional[CatFactOut]]:
+        """Return cached facts by id; None marks an id that is known not to exist."""
+        keys = {self.item_key.format(fact_id=fact_id): fact_id for fact_id in fact_ids}
+        try:
+            cached = await cache_mget(list(keys))
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] get items error: {e}")
+            return {}
+        return {keys[key]: CatFactOut.model_validate(value) if value else None for key, value in cached.items()}
+
+    async def set_items(self, facts: list[CatFactOut], missing_ids: Optional[list[int]] = None) -> None:
+        items = [
+            (self.item_key.format(fact_id=fact.id), fact.model_dump(mode="json"), cfg.cache_item_TTL) for fact in facts
+        ]
+        items += [
+            (self.item_key.format(fact_id=fact_id), False, cfg.cache_missing_TTL) for fact_id in missing_ids or []
+        ]
+        try:
+            await cache_mset(items)
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] set items error: {e}")
+
+    async def get_bounds(self) -> Optional[tuple[int, int]]:
+        """Return cached (min id, max id) of local facts."""
+        try:
+            bounds = await cache_get(self.bounds_key)
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] get bounds error: {e}")
+            return None
+        return tuple(bounds) if bounds else None
+
+    async def set_bounds(self, bounds: tuple[int, int]) -> None:
+        try:
+            await cache_set(self.bounds_key, list(bounds), cfg.cache_bounds_TTL)
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] set bounds error: {e}")
+
+    async def list_version(self) -> Optional[int]:
+        """Current list version; None if the cache is unavailable (list caching is skipped)."""
+        try:
+            return await cache_get(self.list_version_key) or 0
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] get list version error: {e}")
+            return None
+
+    async def get_list(self, version: int, limit: int, after: Optional[int]) -> Optional[CatFactPage]:
+        try:
+            page = await cache_get(self.list_key.format(version=version, limit=limit, after=after))
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] get list error: {e}")
+            return None
+        return CatFactPage.model_validate(page) if page else None
+
+    async def set_list(self, version: int, limit: int, after: Optional[int], page: CatFactPage) -> None:
+        key = self.list_key.format(version=version, limit=limit, after=after)
+        try:
+            await cache_set(key, page.model_dump(mode="json"), cfg.cache_list_TTL)
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] set list error: {e}")
+
+    async def get_stats(self, fact_id: int) -> Optional[CatFactStatsOut]:
+        """Return cached persisted statistics (without buffered increments)."""
+        try:
+            stats = await cache_get(self.stats_key.format(fact_id=fact_id))
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] get stats error: {e}")
+            return None
+        return CatFactStatsOut.model_validate(stats) if stats else None
+
+    async def set_stats(self, stats: CatFactStatsOut) -> None:
+        try:
+            await cache_set(
+                self.stats_key.format(fact_id=stats.fact_id), stats.model_dump(mode="json"), cfg.cache_stats_TTL
+            )
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] set stats error: {e}")
+
+    async def invalidate_stats(self, fact_ids: list[int]) -> None:
+        """Drop cached statistics, e.g. after buffered increments were persisted."""
+        try:
+            await cache_delete([self.stats_key.format(fact_id=fact_id) for fact_id in fact_ids])
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] invalidate stats error: {e}")
+
+    async def invalidate(self, fact_ids: Optional[list[int]] = None) -> None:
+        """
+        Invalidate after a write: id bounds and list pages always, plus the items
+        and statistics of the given (created, updated or deleted) facts.
+        """
+        keys = [self.bounds_key]
+        for fact_id in fact_ids or []:
+            keys += [self.item_key.format(fact_id=fact_id), self.stats_key.format(fact_id=fact_id)]
+        try:
+            await cache_delete(keys)
+            await cache_incr(self.list_version_key)
+        except Exception as e:
+            logger.error(f"[FACTS][CACHE] invalidate error: {e}")
+
+
+fact_cache = FactCache()
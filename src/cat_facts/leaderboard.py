@@ -0,0 +1,45 @@
+from typing import Optional
+
+from src.core.redis_client import get_redis
+
+
+class FactLeaderboard:
+    """
+    Most-requested facts kept in a Redis sorted set (member = fact id, score = request count).
+
+    Scores are incremented together with the buffered stats (see stats_buffer) and the set
+    is periodically rebuilt from cat_fact_stats plus pending counts to correct any drift.
+    """
+
+    key: str = "stats:facts:leaderboard"
+
+    def increment(self, pipe, fact_id: int, amount: int = 1) -> None:
+        """Queue a score increment on an existing Redis pipeline."""
+        pipe.zincrby(self.key, amount, fact_id)
+
+    async def top(self, n: int) -> list[tuple[int, int]]:
+        """Return up to n (fact_id, request_count) pairs, highest count first."""
+        members = await get_redis().zrevrange(self.key, 0, n - 1, withscores=True)
+        return [(int(fact_id), int(score)) for fact_id, score in members]
+
+    async def remove(self, fact_id: int) -> None:
+        await get_redis().zrem(self.key, fact_id)
+
+    async def rebuild(self, counts: list[tuple[int, int]], ttl: Optional[int] = None) -> None:
+        """Atomically replace the leaderboard with the given (fact_id, request_count) pairs."""
+        redis = get_redis()
+        if not counts:
+            await redis.delete(self.key)
+            return
+
+        tmp_key = f"{self.key}:rebuild"
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.delete(tmp_key)
+            pipe.zadd(tmp_key, {fact_id: count for fact_id, count in counts})
+            pipe.rename(tmp_key, self.key)
+            if ttl:
+                pipe.expire(self.key, ttl)
+            await pipe.execute()
+
+
+leaderboard = FactLeaderboard()
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
-from pydantic import BaseModel, ConfigDict, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, field_validator
 
 from src.cat_facts.config import cat_fact_config as cfg
 from src.database.base_schema import BaseOutModel
@@ -42,6 +42,14 @@ class CatFactUpdate(BaseModel):
         max_length=cfg.max_image_url_length,
     )
 
+    @field_validator("text")
+    @classmethod
+    def text_not_null(cls, value: Optional[str]) -> str:
+        # omitted means "keep"; an explicit null would violate the NOT NULL column
+        if value is None:
+            raise ValueError("text cannot be null")
+        return value
+
 
 class CatFactOut(BaseOutModel):
     """DTO returned for cat facts."""
@@ -52,6 +60,42 @@ class CatFactOut(BaseOutModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CatFactPage(BaseModel):
+    """Keyset-paginated list of cat facts."""
+
+    items: list[CatFactOut]
+    next_after: Optional[int] = Field(None, description="Pass as `after` to fetch the next page")
+
+
+class CatFactSearchPage(BaseModel):
+    """Ranked full-text search results, one keyset page at a time."""
+
+    items: list[CatFactOut]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+
+
+class CatFactTopOut(BaseModel):
+    """Leaderboard entry: a fact and how often it was requested."""
+
+    fact_id: int
+    request_count: int
+
+
+class CatFactBulkError(BaseModel):
+    """Validation error for a single item of a bulk request."""
+
+    index: int
+    errors: list[dict[str, Any]]
+
+
+class CatFactBulkResult(BaseModel):
+    """Result of a bulk fact import."""
+
+    created: int
+    ids: list[int]
+    errors: list[CatFactBulkError]
+
+
 class CatFactStatsOut(BaseOutModel):
     """DTO for returning statistics for a local cat fact."""
 
@@ -1,11 +1,16 @@
+import random
+from datetime import datetime, timedelta
 from typing import Optional
 
-from sqlalchemy import func, select, update
+from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.cat_facts.schema import CatFact, CatFactStats
-from src.database.base_repository import BaseRepository
+from src.cat_facts.config import cat_fact_config as cfg
+from src.cat_facts.schema import CatFact, CatFactStats, CatFactStatsFlush
+from src.database.base_repository import MAX_BIND_PARAMS, BaseRepository, chunked
+from src.database.routing import use_primary
 from src.database.utils import get_datetime
+from src.settings import settings
 
 
 class CatFactRepository(BaseRepository[CatFact]):
@@ -14,9 +19,63 @@ class CatFactRepository(BaseRepository[CatFact]):
     def __init__(self, session: AsyncSession):
         super().__init__(CatFact, session)
 
+    async def search(
+        self, tsquery: str, limit: int, after: Optional[tuple[float, int]] = None
+    ) -> list[tuple[CatFact, float]]:
+        """
+        Full-text search over fact text using the GIN-indexed search_vector.
+        Results are ordered by rank, then id; `after` is the (rank, id) of the last seen row.
+        """
+        query = func.to_tsquery(cfg.search_config, tsquery)
+        rank = func.ts_rank(CatFact.search_vector, query)
+
+        stmt = (
+            select(CatFact, rank.label("rank"))
+            .where(CatFact.search_vector.op("@@")(query))
+            .order_by(rank.desc(), CatFact.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            after_rank, after_id = after
+            stmt = stmt.where(or_(rank < after_rank, and_(rank == after_rank, CatFact.id < after_id)))
+
+        result = await self.session.execute(stmt)
+        return [(fact, fact_rank) for fact, fact_rank in result.all()]
+
+    async def get_id_bounds(self) -> Optional[tuple[int, int]]:
+        """Return (min id, max id) of local facts, or None if there are none."""
+        stmt = select(func.min(CatFact.id), func.max(CatFact.id))
+        low, high = (await self.session.execute(stmt)).one()
+        if low is None:
+            return None
+        return low, high
+
     async def get_random(self) -> Optional[CatFact]:
-        """Return a random local cat fact."""
-        stmt = select(CatFact).order_by(func.random()).limit(1)
+        """
+        Return a random local cat fact.
+
+        Draws random ids between min(id) and max(id) and looks them up by primary key;
+        the first draw that hits an existing row wins, so the choice stays uniform
+        despite gaps. If every probe lands in a gap, the next existing id is used.
+        """
+        bounds = await self.get_id_bounds()
+        if bounds is None:
+            return None
+
+        low, high = bounds
+        for _ in range(cfg.random_probe_rounds):
+            candidates = [random.randint(low, high) for _ in range(cfg.random_probe_batch_size)]
+            stmt = select(CatFact).where(CatFact.id.in_(set(candidates)))
+            found = {fact.id: fact for fact in (await self.session.execute(stmt)).scalars()}
+            for candidate in candidates:
+                if candidate in found:
+                    return found[candidate]
+
+        return await self.get_first_from(random.randint(low, high))
+
+    async def get_first_from(self, fact_id: int) -> Optional[CatFact]:
+        """Return the fact with the smallest id >= fact_id."""
+        stmt = select(CatFact).where(CatFact.id >= fact_id).order_by(CatFact.id).limit(1)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
@@ -33,6 +92,17 @@ class CatFactStatsRepository(BaseRepository[CatFactStats]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_top(self, n: int) -> list[CatFactStats]:
+        """Return the n most requested facts' stats (served by ix_cat_fact_stats_request_count)."""
+        stmt = select(CatFactStats).order_by(CatFactStats.request_count.desc(), CatFactStats.fact_id).limit(n)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def delete_by_fact_id(self, fact_id: int) -> None:
+        """Delete the statistics record of a fact."""
+        await self.session.execute(delete(CatFactStats).where(CatFactStats.fact_id == fact_id))
+        await self._finish()
+
     async def create_initial(self, fact_id: int) -> CatFactStats:
         """Create initial statistics record for a fact."""
         obj = CatFactStats(
@@ -41,7 +111,7 @@ class CatFactStatsRepository(BaseRepository[CatFactStats]):
             last_requested_at=None,
         )
         self.session.add(obj)
-        await self.session.commit()
+        await self._finish()
         await self.session.refresh(obj)
         return obj
 
@@ -58,5 +128,77 @@ class CatFactStatsRepository(BaseRepository[CatFactStats]):
         )
         result = await self.session.execute(stmt)
         updated = result.scalar_one_or_none()
-        await self.session.commit()
+        await self._finish()
         return updated
+
+    async def apply_increments(
+        self, increments: dict[int, tuple[int, Optional[datetime]]], flush_id: Optional[str] = None
+    ) -> bool:
+        """
+        Add buffered request counts in one batched upsert.
+        increments maps fact_id -> (count, last_requested_at); facts deleted meanwhile are skipped.
+        With flush_id the batch is recorded in the same transaction, and a batch whose flush_id
+        was already applied is skipped (returns False), so a retried batch is never counted twice.
+        """
+        if not increments:
+            return True
+
+        # a lagging replica would miss new facts and silently drop their counts
+        use_primary(self.session)
+        if flush_id is not None and not await self._record_flush(flush_id):
+            await self._abort()
+            return False
+
+        existing = await self.session.execute(select(CatFact.id).where(CatFact.id.in_(increments.keys())))
+        now = get_datetime()
+        rows = [
+            {
+                "fact_id": fact_id,
+                "request_count": increments[fact_id][0],
+                "last_requested_at": increments[fact_id][1],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for fact_id in existing.scalars()
+        ]
+
+        # an empty rows list (every fact deleted) still commits the flush record
+        if rows:
+            for chunk in chunked(rows, MAX_BIND_PARAMS // len(rows[0])):
+                stmt = self._upsert_insert().values(list(chunk))
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[CatFactStats.fact_id],
+                    set_={
+                        "request_count": CatFactStats.request_count + stmt.excluded.request_count,
+                        "last_requested_at": self._latest(
+                            CatFactStats.last_requested_at, stmt.excluded.last_requested_at
+                        ),
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                )
+                await self.session.execute(stmt)
+        await self._finish()
+        return True
+
+    async def _record_flush(self, flush_id: str) -> bool:
+        """Mark a flush batch as applied; False if it already was. Prunes ids past retention."""
+        now = get_datetime()
+        await self.session.execute(
+            delete(CatFactStatsFlush).where(
+                CatFactStatsFlush.applied_at < now - timedelta(seconds=settings.stats_flush_id_retention)
+            )
+        )
+        stmt = (
+            self._upsert_insert(CatFactStatsFlush)
+            .values(flush_id=flush_id, applied_at=now)
+            .on_conflict_do_nothing(index_elements=[CatFactStatsFlush.flush_id])
+            .returning(CatFactStatsFlush.flush_id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    def _latest(self, a, b):
+        """NULL-ignoring maximum of two timestamps (SQLite has no GREATEST)."""
+        if self._dialect_name() == "sqlite":
+            return func.max(func.coalesce(a, b), func.coalesce(b, a))
+        return func.greatest(a, b)
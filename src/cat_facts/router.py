@@ -1,8 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.cat_facts.models import CatFactCreate, CatFactOut, CatFactStatsOut
+from src.cat_facts.config import cat_fact_config as cfg
+from src.cat_facts.models import (
+    CatFactBulkResult,
+    CatFactCreate,
+    CatFactOut,
+    CatFactPage,
+    CatFactSearchPage,
+    CatFactStatsOut,
+    CatFactTopOut,
+    CatFactUpdate,
+)
 from src.cat_facts.service import CatFactService
+from src.cat_facts.utils import iter_request_items
 from src.database.base import get_db_session
 
 router = APIRouter(prefix="/facts", tags=["Cat Facts"])
@@ -23,6 +37,22 @@ async def create_fact(data: CatFactCreate, service: CatFactService = Depends(get
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/bulk", response_model=CatFactBulkResult)
+async def bulk_create_facts(request: Request, service: CatFactService = Depends(get_fact_service)):
+    """
+    Create many local cat facts in one transaction.
+
+    Accepts a JSON array of facts, or NDJSON (`Content-Type: application/x-ndjson`,
+    one fact per line). Invalid items are skipped and reported by index.
+    """
+    try:
+        return await service.bulk_create_facts(iter_request_items(request))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/random")
 async def get_fact(source: str = "local", service: CatFactService = Depends(get_fact_service)):
     """
@@ -49,14 +79,74 @@ async def get_fact_stats(fact_id: int, service: CatFactService = Depends(get_fac
     return stats
 
 
-@router.get("", response_model=list[CatFactOut])
-async def get_all_facts(service: CatFactService = Depends(get_fact_service)):
+@router.get("", response_model=CatFactPage)
+async def get_all_facts(
+    limit: int = Query(cfg.page_default_limit, ge=1, le=cfg.page_max_limit),
+    after: Optional[int] = Query(None, description="Return facts with id greater than this cursor"),
+    service: CatFactService = Depends(get_fact_service),
+):
     """
-    Return all local cat facts.
+    Return local cat facts ordered by id, one keyset page at a time.
     """
     try:
-        facts = await service.fact_repo.get_all()
-        return [CatFactOut.model_validate(f) for f in facts]
+        return await service.list_facts(limit, after)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/top", response_model=list[CatFactTopOut])
+async def get_top_facts(
+    n: int = Query(10, ge=1, le=cfg.leaderboard_max_n),
+    service: CatFactService = Depends(get_fact_service),
+):
+    """
+    Return the most requested local facts, highest request count first.
+    """
+    try:
+        return await service.get_top_facts(n)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/search", response_model=CatFactSearchPage)
+async def search_facts(
+    q: str = Query(..., min_length=1, max_length=cfg.max_text_length, description="Words to search for"),
+    limit: int = Query(cfg.search_default_limit, ge=1, le=cfg.search_max_limit),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    service: CatFactService = Depends(get_fact_service),
+):
+    """
+    Full-text search over local cat facts, ranked by relevance.
+    Every word is matched as a prefix ("purr" matches "purring").
+    """
+    try:
+        return await service.search_facts(q, limit, cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/export")
+async def export_facts():
+    """
+    Stream all local cat facts as NDJSON (one JSON object per line).
+    """
+    return StreamingResponse(CatFactService.export_ndjson(), media_type="application/x-ndjson")
+
+
+@router.patch("/{fact_id}", response_model=CatFactOut)
+async def update_fact(fact_id: int, data: CatFactUpdate, service: CatFactService = Depends(get_fact_service)):
+    """
+    Partially update a local cat fact.
+    """
+    try:
+        fact = await service.update_fact(fact_id, data)
+        if not fact:
+            raise HTTPException(status_code=404, detail="Fact not found")
+        return fact
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -67,12 +157,12 @@ async def delete_fact(fact_id: int, service: CatFactService = Depends(get_fact_s
     Delete a local cat fact and its statistics.
     """
     try:
-        fact = await service.fact_repo.get_by_id(fact_id)
-        if not fact:
+        if not await service.delete_fact(fact_id):
             raise HTTPException(status_code=404, detail="Fact not found")
 
-        await service.fact_repo.delete(fact_id)
         return {"status": "deleted", "id": fact_id}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Computed, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database.base import Base
@@ -12,6 +13,7 @@ class CatFact(Base, UpdatedMix):
     """Local cat fact."""
 
     __tablename__ = "cat_facts"
+    __table_args__ = (Index("ix_cat_facts_search_vector", "search_vector", postgresql_using="gin"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -19,6 +21,14 @@ class CatFact(Base, UpdatedMix):
 
     image_url: Mapped[Optional[str]] = mapped_column(String(300), nullable=True)
 
+    # Maintained by PostgreSQL; only used for filtering/ranking, so never loaded by default
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('english', text)", persisted=True),
+        nullable=True,
+        deferred=True,
+    )
+
     stats: Mapped["CatFactStats"] = relationship(back_populates="fact", uselist=False, cascade="all, delete")
 
 
@@ -26,6 +36,7 @@ class CatFactStats(Base, UpdatedMix):
     """Statistics for local cat facts."""
 
     __tablename__ = "cat_fact_stats"
+    __table_args__ = (Index("ix_cat_fact_stats_request_count", "request_count"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -36,3 +47,14 @@ class CatFactStats(Base, UpdatedMix):
     last_requested_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
 
     fact: Mapped["CatFact"] = relationship(back_populates="stats")
+
+
+class CatFactStatsFlush(Base):
+    """Write-behind flush batches already applied to cat_fact_stats, so a retried batch is skipped."""
+
+    __tablename__ = "cat_fact_stats_flushes"
+
+    flush_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    # old rows are pruned once no retry of their batch can be pending
+    applied_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, index=True)
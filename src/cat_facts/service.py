@@ -1,11 +1,34 @@
 # src/cat_facts/service.py
 
-from typing import Optional
+import logging
+import random
+from typing import Any, AsyncIterator, Optional
 
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.cat_facts.models import CatFactCreate, CatFactOut, CatFactStatsOut
+from src.cat_facts.config import cat_fact_config as cfg
+from src.cat_facts.fact_cache import fact_cache
+from src.cat_facts.leaderboard import leaderboard
+from src.cat_facts.models import (
+    CatFactBulkError,
+    CatFactBulkResult,
+    CatFactCreate,
+    CatFactOut,
+    CatFactPage,
+    CatFactSearchPage,
+    CatFactStatsOut,
+    CatFactTopOut,
+    CatFactUpdate,
+)
 from src.cat_facts.repository import CatFactRepository, CatFactStatsRepository
+from src.cat_facts.stats_buffer import stats_buffer
+from src.cat_facts.utils import build_prefix_tsquery, decode_search_cursor, encode_search_cursor
+from src.database.base import db_session_factory
+from src.database.unit_of_work import UnitOfWork
+from src.database.utils import get_datetime
+
+logger = logging.getLogger(__name__)
 
 
 class CatFactService:
@@ -15,31 +38,215 @@ class CatFactService:
         self.session = session
         self.fact_repo = CatFactRepository(session)
         self.stats_repo = CatFactStatsRepository(session)
+        self.uow = UnitOfWork(session)
+
+    @staticmethod
+    def _to_payload(data: CatFactCreate | CatFactUpdate) -> dict:
+        payload = data.model_dump(exclude_unset=isinstance(data, CatFactUpdate))
+        if payload.get("image_url"):
+            payload["image_url"] = str(payload["image_url"])
+        return payload
 
     async def create_fact(self, data: CatFactCreate) -> CatFactOut:
         """Create a new local fact + initialize its statistics."""
 
-        payload = data.model_dump()
-        if payload.get("image_url"):
-            payload["image_url"] = str(payload["image_url"])
+        payload = self._to_payload(data)
+
+        async with self.uow:
+            fact = await self.fact_repo.create(payload)
+            await self.stats_repo.create_initial(fact.id)
 
-        fact = await self.fact_repo.create(payload)
+        await fact_cache.invalidate([fact.id])
+        return CatFactOut.model_validate(fact)
+
+    async def update_fact(self, fact_id: int, data: CatFactUpdate) -> Optional[CatFactOut]:
+        """Partially update a local fact; None if it does not exist."""
 
-        await self.stats_repo.create_initial(fact.id)
+        payload = self._to_payload(data)
+        if not payload:
+            fact = await self.fact_repo.get_by_id(fact_id)
+            return CatFactOut.model_validate(fact) if fact else None
 
+        payload["updated_at"] = get_datetime()
+        fact = await self.fact_repo.update(fact_id, payload)
+        if not fact:
+            return None
+
+        await fact_cache.invalidate([fact_id])
         return CatFactOut.model_validate(fact)
 
+    async def delete_fact(self, fact_id: int) -> bool:
+        """Delete a local fact together with its statistics; False if it does not exist."""
+
+        fact = await self.fact_repo.get_by_id(fact_id)
+        if not fact:
+            return False
+
+        async with self.uow:
+            await self.stats_repo.delete_by_fact_id(fact_id)
+            await self.fact_repo.delete(fact_id)
+
+        await fact_cache.invalidate([fact_id])
+        try:
+            await leaderboard.remove(fact_id)
+        except Exception as e:
+            logger.error(f"[FACTS][LEADERBOARD] remove error: {e}")
+
+        return True
+
+    async def _insert_batch(self, rows: list[dict]) -> list[int]:
+        """Insert facts with their initial statistics without committing."""
+        if not rows:
+            return []
+
+        facts = await self.fact_repo.bulk_create(rows, commit=False)
+        await self.stats_repo.bulk_create(
+            [{"fact_id": f.id, "request_count": 0, "last_requested_at": None} for f in facts],
+            commit=False,
+        )
+        return [f.id for f in facts]
+
+    async def bulk_create_facts(self, items: AsyncIterator[Any]) -> CatFactBulkResult:
+        """
+        Validate and insert many facts with their statistics in a single transaction.
+        Items are raw JSON lines (bytes) or parsed objects; invalid items are reported
+        by index and skipped, valid ones are inserted in chunks of cfg.bulk_chunk_size.
+        """
+
+        ids: list[int] = []
+        errors: list[CatFactBulkError] = []
+        batch: list[dict] = []
+        index = 0
+
+        async with self.uow:
+            async for item in items:
+                try:
+                    if isinstance(item, (bytes, str)):
+                        data = CatFactCreate.model_validate_json(item)
+                    else:
+                        data = CatFactCreate.model_validate(item)
+                    batch.append(self._to_payload(data))
+                except ValidationError as e:
+                    errors.append(
+                        CatFactBulkError(index=index, errors=e.errors(include_url=False, include_context=False))
+                    )
+                index += 1
+
+                if len(batch) >= cfg.bulk_chunk_size:
+                    ids += await self._insert_batch(batch)
+                    batch = []
+
+            ids += await self._insert_batch(batch)
+
+        if ids:
+            # per-id invalidation would be one huge DEL and pub/sub message for a large import;
+            # only negative entries can be stale for new ids, and those expire after cache_missing_TTL
+            await fact_cache.invalidate()
+        logger.info(f"[FACTS][BULK] OK ({len(ids)} created, {len(errors)} invalid)")
+        return CatFactBulkResult(created=len(ids), ids=ids, errors=errors)
+
+    async def list_facts(self, limit: int, after: Optional[int] = None) -> CatFactPage:
+        """Return one keyset page of local facts ordered by id (cached per list version)."""
+
+        version = await fact_cache.list_version()
+        if version is not None:
+            page = await fact_cache.get_list(version, limit, after)
+            if page:
+                return page
+
+        # one extra row tells whether another page exists
+        facts = await self.fact_repo.get_page(limit + 1, after)
+        items = [CatFactOut.model_validate(f) for f in facts[:limit]]
+        next_after = items[-1].id if len(facts) > limit else None
+        page = CatFactPage(items=items, next_after=next_after)
+
+        if version is not None:
+            await fact_cache.set_list(version, limit, after, page)
+        return page
+
+    async def search_facts(self, query: str, limit: int, cursor: Optional[str] = None) -> CatFactSearchPage:
+        """Return ranked facts whose text matches every word of the query as a prefix."""
+
+        tsquery = build_prefix_tsquery(query)
+        if tsquery is None:
+            return CatFactSearchPage(items=[])
+
+        after = decode_search_cursor(cursor) if cursor else None
+        results = await self.fact_repo.search(tsquery, limit + 1, after)
+
+        items = [CatFactOut.model_validate(fact) for fact, _ in results[:limit]]
+        next_cursor = None
+        if len(results) > limit:
+            last_fact, last_rank = results[limit - 1]
+            next_cursor = encode_search_cursor(last_rank, last_fact.id)
+
+        return CatFactSearchPage(items=items, next_cursor=next_cursor)
+
+    @staticmethod
+    async def export_ndjson() -> AsyncIterator[bytes]:
+        """
+        Stream all local facts as NDJSON lines.
+        Uses its own session: the response body is produced after the request-scoped
+        session dependency has already been closed.
+        """
+        async with db_session_factory() as session:
+            async for row in CatFactRepository(session).stream_rows(cfg.export_batch_size):
+                yield CatFactOut.model_validate(row).model_dump_json().encode() + b"\n"
+
+    async def _get_id_bounds(self) -> Optional[tuple[int, int]]:
+        bounds = await fact_cache.get_bounds()
+        if bounds is None:
+            bounds = await self.fact_repo.get_id_bounds()
+            if bounds is not None:
+                await fact_cache.set_bounds(bounds)
+        return bounds
+
+    async def _get_facts(self, fact_ids: list[int]) -> dict[int, Optional[CatFactOut]]:
+        """Resolve facts by id from the cache, loading (and caching) only the misses."""
+        found = await fact_cache.get_items(fact_ids)
+        missing = [fact_id for fact_id in fact_ids if fact_id not in found]
+        if missing:
+            loaded = {fact.id: CatFactOut.model_validate(fact) for fact in await self.fact_repo.get_many(missing)}
+            await fact_cache.set_items(list(loaded.values()), [fact_id for fact_id in missing if fact_id not in loaded])
+            found.update({fact_id: loaded.get(fact_id) for fact_id in missing})
+        return found
+
+    async def _pick_random_fact(self) -> Optional[CatFactOut]:
+        """
+        Same probing as CatFactRepository.get_random, but ids are resolved through
+        the fact cache, so a warm cache serves the pick without touching cat_facts.
+        """
+        bounds = await self._get_id_bounds()
+        if bounds is None:
+            return None
+
+        low, high = bounds
+        for _ in range(cfg.random_probe_rounds):
+            candidates = [random.randint(low, high) for _ in range(cfg.random_probe_batch_size)]
+            found = await self._get_facts(list(dict.fromkeys(candidates)))
+            for candidate in candidates:
+                if found.get(candidate):
+                    return found[candidate]
+
+        fact = await self.fact_repo.get_first_from(random.randint(low, high))
+        return CatFactOut.model_validate(fact) if fact else None
+
     async def get_local_random_fact(self) -> Optional[CatFactOut]:
         """Return random local fact and update its statistics."""
 
-        fact = await self.fact_repo.get_random()
+        fact = await self._pick_random_fact()
         if not fact:
             return None
 
-        # Update statistics
-        await self.stats_repo.increment_request_count(fact.id)
+        # Update statistics (write-behind; direct update if the buffer is unavailable)
+        try:
+            await stats_buffer.record(fact.id)
+        except Exception as e:
+            logger.error(f"[FACTS][STATS] buffer error, updating directly: {e}")
+            await self.stats_repo.increment_request_count(fact.id)
+            await fact_cache.invalidate_stats([fact.id])
 
-        return CatFactOut.model_validate(fact)
+        return fact
 
     async def get_fact(self, source: str) -> dict:
         """
@@ -65,11 +272,51 @@ class CatFactService:
             "source": "local",
         }
 
+    async def get_top_facts(self, n: int) -> list[CatFactTopOut]:
+        """Return the n most requested facts, from the Redis leaderboard or Postgres as a fallback."""
+
+        try:
+            top = await leaderboard.top(n)
+            if top:
+                return [CatFactTopOut(fact_id=fact_id, request_count=count) for fact_id, count in top]
+        except Exception as e:
+            logger.error(f"[FACTS][LEADERBOARD] read error, using database: {e}")
+
+        rows = await self.stats_repo.get_top(n)
+        try:
+            pending = await stats_buffer.pending_counts([row.fact_id for row in rows])
+        except Exception as e:
+            logger.error(f"[FACTS][STATS] buffer error, returning persisted counts: {e}")
+            pending = {}
+
+        top = [
+            CatFactTopOut(fact_id=row.fact_id, request_count=row.request_count + pending.get(row.fact_id, 0))
+            for row in rows
+        ]
+        return sorted(top, key=lambda entry: entry.request_count, reverse=True)
+
     async def get_fact_stats(self, fact_id: int) -> Optional[CatFactStatsOut]:
         """Return statistics for a specific fact."""
 
-        stats = await self.stats_repo.get_by_fact_id(fact_id)
-        if not stats:
-            return None
+        result = await fact_cache.get_stats(fact_id)
+        if result is None:
+            stats = await self.stats_repo.get_by_fact_id(fact_id)
+            if not stats:
+                return None
+            result = CatFactStatsOut.model_validate(stats)
+            await fact_cache.set_stats(result)
+
+        # Merge counts that are still buffered and not yet flushed
+        try:
+            pending_count, pending_last = await stats_buffer.pending(fact_id)
+        except Exception as e:
+            logger.error(f"[FACTS][STATS] buffer error, returning persisted stats: {e}")
+            return result
 
-        return CatFactStatsOut.model_validate(stats)
+        last_requested_at = max(filter(None, (result.last_requested_at, pending_last)), default=None)
+        return result.model_copy(
+            update={
+                "request_count": result.request_count + pending_count,
+                "last_requested_at": last_requested_at,
+            }
+        )
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+
+import sentry_sdk
+from redis.exceptions import ResponseError
+
+from src.cache.service import cache_lock_acquire
+from src.cat_facts.config import cat_fact_config as cfg
+from src.cat_facts.fact_cache import fact_cache
+from src.cat_facts.leaderboard import leaderboard
+from src.cat_facts.repository import CatFactStatsRepository
+from src.core.redis_client import get_redis
+from src.database.base import db_session_factory
+from src.database.utils import get_datetime
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FactStatsBuffer:
+    """
+    Write-behind buffer for fact request statistics.
+
+    Increments are accumulated in a Redis hash (shared by all workers) and flushed
+    to cat_fact_stats in batched upserts on an interval or once the hash grows past
+    a threshold. Hash fields are "count:<fact_id>" and "last:<fact_id>".
+    The same pipeline also bumps the fact's score on the leaderboard.
+    """
+
+    pending_key: str = "stats:facts:pending"
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    async def record(self, fact_id: int) -> None:
+        """Buffer one request for a fact."""
+        redis = get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(self.pending_key, f"count:{fact_id}", 1)
+            pipe.hset(self.pending_key, f"last:{fact_id}", get_datetime().isoformat())
+            leaderboard.increment(pipe, fact_id)
+            pipe.hlen(self.pending_key)
+            *_, size = await pipe.execute()
+
+        # two fields per fact
+        if size >= settings.stats_flush_threshold * 2:
+            self._schedule_flush()
+
+    async def pending(self, fact_id: int) -> tuple[int, Optional[datetime]]:
+        """Return (buffered count, buffered last_requested_at) for a fact."""
+        count, last = await get_redis().hmget(self.pending_key, f"count:{fact_id}", f"last:{fact_id}")
+        return int(count or 0), datetime.fromisoformat(last.decode()) if last else None
+
+    async def pending_counts(self, fact_ids: list[int]) -> dict[int, int]:
+        """Return buffered counts for many facts at once."""
+        if not fact_ids:
+            return {}
+        counts = await get_redis().hmget(self.pending_key, [f"count:{fact_id}" for fact_id in fact_ids])
+        return {fact_id: int(count or 0) for fact_id, count in zip(fact_ids, counts)}
+
+    async def reconcile_leaderboard(self) -> None:
+        """
+        Rebuild the leaderboard from persisted plus pending counts.
+        The lock is left to expire, so only one worker reconciles per interval.
+        """
+        if not await cache_lock_acquire(leaderboard.key, settings.leaderboard_reconcile_interval):
+            return
+
+        async with db_session_factory() as session:
+            top = await CatFactStatsRepository(session).get_top(cfg.leaderboard_size)
+
+        pending = await self.pending_counts([stats.fact_id for stats in top])
+        counts = [(stats.fact_id, stats.request_count + pending[stats.fact_id]) for stats in top]
+        await leaderboard.rebuild(counts)
+        logger.info(f"[STATS][LEADERBOARD] reconciled ({len(counts)} facts)")
+
+    @staticmethod
+    def _parse(raw: dict) -> dict[int, tuple[int, Optional[datetime]]]:
+        increments: dict[int, list] = {}
+        for field, value in raw.items():
+            kind, fact_id = field.decode().split(":", 1)
+            item = increments.setdefault(int(fact_id), [0, None])
+            if kind == "count":
+                item[0] = int(value)
+            else:
+                item[1] = datetime.fromisoformat(value.decode())
+        return {fact_id: (count, last) for fact_id, (count, last) in increments.items() if count}
+
+    async def flush(self) -> int:
+        """
+        Persist buffered increments; returns the number of facts flushed.
+        A batch that fails is left in its flushing key and applied by recover_orphans();
+        its flush id makes sure it is counted at most once.
+        """
+        redis = get_redis()
+        # RENAME detaches the current batch atomically; new increments go to a fresh hash
+        flush_id = uuid.uuid4().hex
+        flushing_key = self._flushing_key(flush_id)
+        try:
+            await redis.rename(self.pending_key, flushing_key)
+        except ResponseError:
+            return 0
+
+        try:
+            increments = self._parse(await redis.hgetall(flushing_key))
+            async with db_session_factory() as session:
+                await CatFactStatsRepository(session).apply_increments(increments, flush_id)
+        except Exception as e:
+            logger.exception(f"[STATS][FLUSH] Error, batch {flush_id} left for recovery")
+            sentry_sdk.capture_exception(e)
+            await self._release(flushing_key, flush_id)
+            raise
+
+        await self._discard(flushing_key)
+        await fact_cache.invalidate_stats(list(increments))
+        logger.info(f"[STATS][FLUSH] OK ({len(increments)} facts)")
+        return len(increments)
+
+    def _flushing_key(self, flush_id: str, created_at: Optional[int] = None) -> str:
+        # the timestamp lets recovery tell abandoned batches from ones still being flushed
+        created_at = int(time.time()) if created_at is None else created_at
+        return f"{self.pending_key}:flushing:{created_at}:{flush_id}"
+
+    async def _release(self, flushing_key: str, flush_id: str) -> None:
+        """Hand a failed batch to the next recovery run instead of waiting out stats_orphan_age."""
+        try:
+            await get_redis().rename(flushing_key, self._flushing_key(flush_id, created_at=0))
+        except Exception as e:
+            logger.error(f"[STATS][FLUSH] could not release {flushing_key}, recovered after stats_orphan_age: {e}")
+
+    async def _discard(self, flushing_key: str) -> None:
+        """Drop an applied batch; if that fails, recovery finds its flush id applied and skips it."""
+        try:
+            await get_redis().delete(flushing_key)
+        except Exception as e:
+            logger.error(f"[STATS][FLUSH] could not delete applied batch {flushing_key}: {e}")
+
+    async def recover_orphans(self) -> int:
+        """
+        Apply batches left in flushing keys (a failed flush or a crashed worker);
+        returns the number of batches recovered. Keys younger than
+        settings.stats_orphan_age may still be flushing elsewhere and are skipped.
+        """
+        redis = get_redis()
+        recovered = 0
+        async for key in redis.scan_iter(match=f"{self.pending_key}:flushing:*"):
+            key = key.decode() if isinstance(key, bytes) else key
+            created_at, flush_id = key.rsplit(":", 2)[-2:]
+            if time.time() - int(created_at) < settings.stats_orphan_age:
+                continue
+
+            # claim the batch under a fresh timestamp; if this worker fails too, it is recovered later
+            claimed_key = self._flushing_key(flush_id)
+            try:
+                await redis.rename(key, claimed_key)
+            except ResponseError:
+                continue  # claimed by another worker
+
+            increments = self._parse(await redis.hgetall(claimed_key))
+            async with db_session_factory() as session:
+                applied = await CatFactStatsRepository(session).apply_increments(increments, flush_id)
+            await redis.delete(claimed_key)
+            if applied:
+                await fact_cache.invalidate_stats(list(increments))
+            recovered += 1
+
+        if recovered:
+            logger.warning(f"[STATS][RECOVER] {recovered} abandoned batches recovered")
+        return recovered
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._safe_flush())
+
+    async def _safe_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"[STATS][FLUSH] error: {e}")
+
+    async def _safe_reconcile(self) -> None:
+        try:
+            await self.reconcile_leaderboard()
+        except Exception as e:
+            logger.error(f"[STATS][LEADERBOARD] reconcile error: {e}")
+
+    async def _safe_recover(self) -> None:
+        try:
+            await self.recover_orphans()
+        except Exception as e:
+            logger.error(f"[STATS][RECOVER] error: {e}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        await self._safe_recover()
+        await self._safe_reconcile()
+        reconciled_at = loop.time()
+
+        while True:
+            await asyncio.sleep(settings.stats_flush_interval)
+            await self._safe_flush()
+
+            if loop.time() - reconciled_at >= settings.leaderboard_reconcile_interval:
+                await self._safe_recover()
+                await self._safe_reconcile()
+                reconciled_at = loop.time()
+
+    def start(self) -> None:
+        """
+        Start the periodic flush loop.
+        Should be called inside FastAPI lifespan.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and persist whatever is still buffered."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self._safe_flush()
+
+
+stats_buffer = FactStatsBuffer()
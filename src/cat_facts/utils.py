@@ -0,0 +1,66 @@
+import base64
+import json
+import re
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import HTTPException, Request
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def iter_request_items(request: Request) -> AsyncIterator[Any]:
+    """
+    Yield items of a bulk request body.
+
+    - NDJSON bodies are read incrementally and yielded as raw lines (bytes),
+      so a malformed line is reported as that item's error.
+    - JSON bodies must be an array; its elements are yielded as parsed objects.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type in NDJSON_MEDIA_TYPES:
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array")
+
+    for item in items:
+        yield item
+
+
+def build_prefix_tsquery(query: str) -> Optional[str]:
+    """
+    Turn free text into a to_tsquery() expression matching all words as prefixes,
+    e.g. "cat slee" -> "cat:* & slee:*". Returns None if there is nothing to search for.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def encode_search_cursor(rank: float, fact_id: int) -> str:
+    """Opaque keyset cursor for (rank, id) ordered search results."""
+    return base64.urlsafe_b64encode(json.dumps([rank, fact_id]).encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, fact_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(fact_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid search cursor")
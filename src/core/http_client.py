@@ -0,0 +1,63 @@
+import importlib.util
+import logging
+
+import httpx
+
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Process-wide client; created in the FastAPI lifespan and shared by all requests
+_http_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 support in httpx requires the optional `h2` package."""
+    return settings.http_http2 and importlib.util.find_spec("h2") is not None
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    """Build an AsyncClient with a bounded keep-alive connection pool."""
+    return httpx.AsyncClient(
+        http2=_http2_available(),
+        timeout=httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+    )
+
+
+def init_http_client() -> httpx.AsyncClient:
+    """
+    Create the shared HTTP client.
+    Should be called inside FastAPI lifespan.
+    """
+    global _http_client
+
+    if _http_client is None:
+        _http_client = _create_http_client()
+        logger.info(f"[HTTP][INIT] Client created (http2={_http2_available()})")
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its connection pool."""
+    global _http_client
+
+    if _http_client is None:
+        return
+
+    await _http_client.aclose()
+    _http_client = None
+    logger.info("[HTTP][CLOSE] Client closed")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it lazily outside the lifespan."""
+    global _http_client
+
+    if _http_client is None:
+        _http_client = _create_http_client()
+    return _http_client
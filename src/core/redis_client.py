@@ -1,11 +1,69 @@
+import logging
+
 from redis import asyncio as aioredis
 
 from src.settings import settings
 
+logger = logging.getLogger(__name__)
 
-def get_redis() -> aioredis.Redis:
-    return aioredis.from_url(
+# Process-wide client; created in the FastAPI lifespan and shared by all requests
+_redis: aioredis.Redis | None = None
+
+
+def _create_redis() -> aioredis.Redis:
+    """Build a Redis client backed by a bounded, blocking connection pool."""
+    pool = aioredis.BlockingConnectionPool.from_url(
         settings.redis_url,
         encoding="utf-8",
-        decode_responses=True,
+        # values are binary (see src.cache.codec); callers decode strings they need
+        decode_responses=False,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        health_check_interval=settings.redis_health_check_interval,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
     )
+    return aioredis.Redis.from_pool(pool)
+
+
+def init_redis() -> aioredis.Redis | None:
+    """
+    Create the shared Redis client.
+    Should be called inside FastAPI lifespan.
+    """
+    global _redis
+
+    if not settings.redis_url:
+        logger.warning("[REDIS][INIT] redis_url is not configured, cache is disabled")
+        return None
+
+    if _redis is None:
+        _redis = _create_redis()
+        logger.info(f"[REDIS][INIT] Connection pool created (max_connections={settings.redis_max_connections})")
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client and disconnect its pool."""
+    global _redis
+
+    if _redis is None:
+        return
+
+    await _redis.aclose()
+    _redis = None
+    logger.info("[REDIS][CLOSE] Connection pool closed")
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the shared Redis client, creating it lazily outside the lifespan."""
+    global _redis
+
+    if _redis is None:
+        _redis = _create_redis()
+    return _redis
+
+
+async def get_redis_client() -> aioredis.Redis:
+    """FastAPI dependency: returns the shared Redis client."""
+    return get_redis()
@@ -4,6 +4,9 @@ import logging
 import sentry_sdk
 from fastapi import APIRouter, HTTPException
 
+from src.database.instrumentation import query_stats
+from src.settings import settings
+
 router = APIRouter(prefix="/common", tags=["common"])
 
 logger = logging.getLogger(__name__)
@@ -41,3 +44,9 @@ async def trigger_error():
         logger.exception("[COMMON][SENTRY-DEBUG] Division by zero error")
         sentry_sdk.capture_exception(e)
         raise HTTPException(500, "Triggered Sentry test error")
+
+
+@router.get("/db/query-stats")
+async def get_query_stats(limit: int = 50):
+    logger.info("[COMMON][QUERY-STATS] Get aggregated query stats")
+    return {"enabled": settings.db_query_instrumentation, "queries": query_stats.snapshot(limit)}
@@ -1,23 +1,70 @@
-from sqlalchemy import text
+import uuid
+
+from sqlalchemy import make_url, text
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.pool import NullPool
 
+from src.database.instrumentation import instrument_engine
+from src.database.routing import ReplicaSet, RoutingSession
 from src.settings import settings
 
 DATABASE_URL: str = settings.postgres
 
-# Async engine for PostgreSQL
-engine = create_async_engine(
-    url=DATABASE_URL,
-    poolclass=NullPool,
-    echo=True,
-)
 
-# Async session factory
+def _engine_options() -> dict:
+    """Connection pool and asyncpg options for the async engine."""
+    connect_args = {
+        # SQLAlchemy-side cache of asyncpg prepared statements
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        # asyncpg's own statement cache
+        "statement_cache_size": settings.db_statement_cache_size,
+    }
+
+    if settings.db_pgbouncer:
+        # PgBouncer in transaction mode may hand every transaction a different server
+        # connection, so prepared statements cannot be cached or reused by name.
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+def _create_engine(url: str):
+    async_engine = create_async_engine(
+        url=url,
+        echo=settings.db_echo,
+        **_engine_options(),
+    )
+    if settings.db_query_instrumentation:
+        instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+def _replica_url(dsn: str) -> str:
+    """Accept plain postgresql:// DSNs and switch them to the asyncpg driver."""
+    url = make_url(dsn)
+    return url.set(drivername=f"{url.get_backend_name()}+asyncpg").render_as_string(hide_password=False)
+
+
+# Async engine for PostgreSQL (primary) and optional read replicas
+engine = _create_engine(DATABASE_URL)
+replica_engines = [_create_engine(_replica_url(dsn)) for dsn in settings.pg_replica_dsns]
+
+RoutingSession.replicas = ReplicaSet([replica.sync_engine for replica in replica_engines])
+
+# Async session factory; plain SELECTs go to replicas, see RoutingSession
 db_session_factory = async_sessionmaker(
     bind=engine,
+    sync_session_class=RoutingSession,
     autoflush=False,
     autocommit=False,
     expire_on_commit=False,
@@ -60,3 +107,13 @@ async def get_db_session():
     """FastAPI dependency: yields an async DB session."""
     async with db_session_factory() as session:
         yield session
+
+
+async def close_db_engine():
+    """
+    Close all pooled connections.
+    Should be called on FastAPI lifespan shutdown.
+    """
+    await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
@@ -1,16 +1,27 @@
 import logging
-from typing import Generic, List, Optional, Type, TypeVar
+from typing import Any, AsyncIterator, Generic, Iterator, List, Optional, Sequence, Type, TypeVar
 
 import sentry_sdk
-from sqlalchemy import delete, select, update
+from sqlalchemy import delete, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.base import Base
+from src.database.unit_of_work import in_unit_of_work
 
 ModelType = TypeVar("ModelType", bound=Base)
 
 logger = logging.getLogger(__name__)
 
+# PostgreSQL accepts at most 32767 bind parameters per statement
+MAX_BIND_PARAMS = 32767
+
+
+def chunked(items: Sequence, size: int) -> Iterator[Sequence]:
+    """Split a sequence into consecutive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
 
 class BaseRepository(Generic[ModelType]):
     """Generic CRUD repository for SQLAlchemy ORM models."""
@@ -36,6 +47,39 @@ class BaseRepository(Generic[ModelType]):
             sentry_sdk.capture_exception(e)
             raise
 
+    async def get_page(self, limit: int, after: Optional[int] = None) -> List[ModelType]:
+        """Return up to `limit` records with id greater than `after`, ordered by id (keyset pagination)."""
+        logger.info(f"[DB][{self.model.__name__}][GET_PAGE] limit={limit}, after={after}")
+
+        try:
+            stmt = select(self.model).order_by(self.model.id).limit(limit)
+            if after is not None:
+                stmt = stmt.where(self.model.id > after)
+            result = await self.session.execute(stmt)
+            items = result.scalars().all()
+
+            logger.info(f"[DB][{self.model.__name__}][GET_PAGE] OK ({len(items)} records)")
+            return items
+
+        except Exception as e:
+            logger.exception(f"[DB][{self.model.__name__}][GET_PAGE] Error")
+            sentry_sdk.capture_exception(e)
+            raise
+
+    async def stream_rows(self, batch_size: int = 1000) -> AsyncIterator[Any]:
+        """
+        Iterate over all rows ordered by id using a server-side cursor.
+        Yields Core rows rather than ORM objects so the session identity map stays empty.
+        """
+        logger.info(f"[DB][{self.model.__name__}][STREAM] batch_size={batch_size}")
+
+        # deferred columns (e.g. large generated ones) are left out, as in ORM loads
+        columns = [prop.columns[0] for prop in inspect(self.model).column_attrs if not prop.deferred]
+        stmt = select(*columns).order_by(self.model.id).execution_options(yield_per=batch_size)
+        result = await self.session.stream(stmt)
+        async for row in result:
+            yield row
+
     async def get_by_id(self, obj_id: int) -> Optional[ModelType]:
         """Return a record by primary key."""
         logger.info(f"[DB][{self.model.__name__}][GET] id={obj_id}")
@@ -64,7 +108,7 @@ class BaseRepository(Generic[ModelType]):
         try:
             obj = self.model(**data)
             self.session.add(obj)
-            await self.session.commit()
+            await self._finish()
             await self.session.refresh(obj)
 
             logger.info(f"[DB][{self.model.__name__}][CREATE] OK id={obj.id}")
@@ -73,7 +117,7 @@ class BaseRepository(Generic[ModelType]):
         except Exception as e:
             logger.exception(f"[DB][{self.model.__name__}][CREATE] Error")
             sentry_sdk.capture_exception(e)
-            await self.session.rollback()
+            await self._abort()
             raise
 
     async def update(self, obj_id: int, data: dict) -> Optional[ModelType]:
@@ -84,7 +128,7 @@ class BaseRepository(Generic[ModelType]):
             stmt = update(self.model).where(self.model.id == obj_id).values(**data).returning(self.model)
             result = await self.session.execute(stmt)
             updated = result.scalar_one_or_none()
-            await self.session.commit()
+            await self._finish()
 
             if updated:
                 logger.info(f"[DB][{self.model.__name__}][UPDATE] OK id={obj_id}")
@@ -96,7 +140,7 @@ class BaseRepository(Generic[ModelType]):
         except Exception as e:
             logger.exception(f"[DB][{self.model.__name__}][UPDATE] Error id={obj_id}")
             sentry_sdk.capture_exception(e)
-            await self.session.rollback()
+            await self._abort()
             raise
 
     async def delete(self, obj_id: int) -> None:
@@ -106,12 +150,181 @@ class BaseRepository(Generic[ModelType]):
         try:
             stmt = delete(self.model).where(self.model.id == obj_id)
             await self.session.execute(stmt)
-            await self.session.commit()
+            await self._finish()
 
             logger.info(f"[DB][{self.model.__name__}][DELETE] OK id={obj_id}")
 
         except Exception as e:
             logger.exception(f"[DB][{self.model.__name__}][DELETE] Error id={obj_id}")
             sentry_sdk.capture_exception(e)
+            await self._abort()
+            raise
+
+    def _rows_per_chunk(self) -> int:
+        """Rows per statement that keep a multi-row statement under the bind parameter limit."""
+        return max(1, MAX_BIND_PARAMS // len(self.model.__table__.columns))
+
+    def _owns_transaction(self, commit: bool) -> bool:
+        """Repositories commit themselves unless asked not to or a UnitOfWork is active."""
+        return commit and not in_unit_of_work(self.session)
+
+    async def _finish(self, commit: bool = True) -> None:
+        """Commit, or only flush when the caller manages the transaction."""
+        if self._owns_transaction(commit):
+            await self.session.commit()
+        else:
+            await self.session.flush()
+
+    async def _abort(self, commit: bool = True) -> None:
+        """Roll back after an error, unless the caller manages the transaction."""
+        if self._owns_transaction(commit):
             await self.session.rollback()
+
+    def _dialect_name(self) -> str:
+        """
+        Dialect of the session's primary bind. Read from the bind directly:
+        session.get_bind() would pin a RoutingSession to the primary.
+        """
+        return self.session.bind.dialect.name
+
+    def _upsert_insert(self, model=None):
+        """Dialect-specific INSERT supporting ON CONFLICT (into self.model unless another model is given)."""
+        if self._dialect_name() == "sqlite":
+            return sqlite.insert(model or self.model)
+        return postgresql.insert(model or self.model)
+
+    async def get_many(self, ids: Sequence[int]) -> List[ModelType]:
+        """Return records for the given primary keys (missing ids are skipped)."""
+        logger.info(f"[DB][{self.model.__name__}][GET_MANY] count={len(ids)}")
+
+        try:
+            items: List[ModelType] = []
+            for chunk in chunked(list(ids), MAX_BIND_PARAMS):
+                result = await self.session.execute(select(self.model).where(self.model.id.in_(chunk)))
+                items.extend(result.scalars().all())
+
+            logger.info(f"[DB][{self.model.__name__}][GET_MANY] OK ({len(items)} records)")
+            return items
+
+        except Exception as e:
+            logger.exception(f"[DB][{self.model.__name__}][GET_MANY] Error")
+            sentry_sdk.capture_exception(e)
+            raise
+
+    async def bulk_create(self, rows: Sequence[dict], commit: bool = True) -> List[ModelType]:
+        """Insert many records with multi-row INSERT ... RETURNING; results keep input order."""
+        logger.info(f"[DB][{self.model.__name__}][BULK_CREATE] count={len(rows)}")
+
+        try:
+            items: List[ModelType] = []
+            stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+            for chunk in chunked(list(rows), self._rows_per_chunk()):
+                result = await self.session.execute(stmt, chunk)
+                items.extend(result.scalars().all())
+            await self._finish(commit)
+
+            logger.info(f"[DB][{self.model.__name__}][BULK_CREATE] OK ({len(items)} records)")
+            return items
+
+        except Exception as e:
+            logger.exception(f"[DB][{self.model.__name__}][BULK_CREATE] Error")
+            sentry_sdk.capture_exception(e)
+            await self._abort(commit)
+            raise
+
+    async def bulk_update(self, updates: dict[int, dict], commit: bool = True) -> int:
+        """
+        Update many records by primary key; `updates` maps id -> changed values.
+        Ids that do not exist are skipped; returns the number of updated rows.
+        """
+        logger.info(f"[DB][{self.model.__name__}][BULK_UPDATE] count={len(updates)}")
+
+        try:
+            updated = 0
+            for chunk in chunked(list(updates), self._rows_per_chunk()):
+                # executemany rowcounts are not reported by every driver (asyncpg), so count the
+                # matched rows up front; FOR UPDATE keeps them from disappearing before the UPDATE
+                existing = await self.session.execute(
+                    select(self.model.id).where(self.model.id.in_(chunk)).with_for_update()
+                )
+                params = [{"id": obj_id, **updates[obj_id]} for obj_id in existing.scalars()]
+                if params:
+                    await self.session.execute(update(self.model), params)
+                updated += len(params)
+            await self._finish(commit)
+
+            logger.info(f"[DB][{self.model.__name__}][BULK_UPDATE] OK ({updated} records)")
+            return updated
+
+        except Exception as e:
+            logger.exception(f"[DB][{self.model.__name__}][BULK_UPDATE] Error")
+            sentry_sdk.capture_exception(e)
+            await self._abort(commit)
+            raise
+
+    async def bulk_delete(self, ids: Sequence[int], commit: bool = True) -> int:
+        """Delete many records by primary key; returns the number of deleted rows."""
+        logger.info(f"[DB][{self.model.__name__}][BULK_DELETE] count={len(ids)}")
+
+        try:
+            deleted = 0
+            for chunk in chunked(list(ids), MAX_BIND_PARAMS):
+                result = await self.session.execute(delete(self.model).where(self.model.id.in_(chunk)))
+                deleted += result.rowcount
+            await self._finish(commit)
+
+            logger.info(f"[DB][{self.model.__name__}][BULK_DELETE] OK ({deleted} records)")
+            return deleted
+
+        except Exception as e:
+            logger.exception(f"[DB][{self.model.__name__}][BULK_DELETE] Error")
+            sentry_sdk.capture_exception(e)
+            await self._abort(commit)
+            raise
+
+    async def upsert(
+        self,
+        rows: Sequence[dict],
+        conflict_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        commit: bool = True,
+    ) -> List[ModelType]:
+        """
+        Insert records or update them on conflict (INSERT ... ON CONFLICT DO UPDATE).
+        By default every given column except the conflict columns and id is updated. With
+        nothing to update, conflicting rows are left as they are (ON CONFLICT DO NOTHING)
+        and only the inserted records are returned.
+        """
+        logger.info(f"[DB][{self.model.__name__}][UPSERT] count={len(rows)}")
+
+        if not rows:
+            return []
+
+        if update_columns is None:
+            update_columns = [col for col in rows[0] if col not in conflict_columns and col != "id"]
+
+        try:
+            stmt = self._upsert_insert()
+            if update_columns:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(conflict_columns),
+                    set_={col: stmt.excluded[col] for col in update_columns},
+                ).returning(self.model, sort_by_parameter_order=True)
+            else:
+                # skipped rows return nothing, so results cannot be matched to input order
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns)).returning(self.model)
+
+            items: List[ModelType] = []
+            for chunk in chunked(list(rows), self._rows_per_chunk()):
+                result = await self.session.execute(stmt, chunk, execution_options={"populate_existing": True})
+                items.extend(result.scalars().all())
+            await self._finish(commit)
+
+            logger.info(f"[DB][{self.model.__name__}][UPSERT] OK ({len(items)} records)")
+            return items
+
+        except Exception as e:
+            logger.exception(f"[DB][{self.model.__name__}][UPSERT] Error")
+            sentry_sdk.capture_exception(e)
+            await self._abort(commit)
             raise
@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import random
+import re
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|(?<!:):(?!:)\w+|\?")
+_IN_LIST = re.compile(r"\bIN \(\?(?:::\w+)?(?:, \?(?:::\w+)?)*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES \(([^()]*)\)(?:, \(\1\))+", re.IGNORECASE)
+
+
+def normalize_statement(statement: str) -> str:
+    """Strip literals and parameter placeholders so equivalent queries group together."""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING.sub("?", normalized)
+    normalized = _PARAM.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    normalized = _VALUES_LIST.sub(r"VALUES (\1), ...", normalized)
+    return normalized
+
+
+def fingerprint(statement: str) -> tuple[str, str]:
+    """Return (short hash, normalized text) for a SQL statement."""
+    normalized = normalize_statement(statement)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12], normalized
+
+
+class QueryStats:
+    """Per-fingerprint timing aggregates."""
+
+    def __init__(self, max_fingerprints: int):
+        self.max_fingerprints = max_fingerprints
+        self._stats: dict[str, dict] = {}
+
+    def record(self, key: str, statement: str, duration_ms: float, rows: int | None) -> None:
+        item = self._stats.get(key)
+        if item is None:
+            if len(self._stats) >= self.max_fingerprints:
+                return
+            item = self._stats[key] = {
+                "statement": statement[:500],
+                "calls": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "rows": 0,
+            }
+
+        item["calls"] += 1
+        item["total_ms"] += duration_ms
+        item["max_ms"] = max(item["max_ms"], duration_ms)
+        if rows is not None and rows >= 0:
+            item["rows"] += rows
+
+    def snapshot(self, limit: int = 50) -> list[dict]:
+        """Return the fingerprints with the highest total time first."""
+        items = sorted(self._stats.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)[:limit]
+        return [
+            {
+                "fingerprint": key,
+                **item,
+                "total_ms": round(item["total_ms"], 3),
+                "max_ms": round(item["max_ms"], 3),
+                "avg_ms": round(item["total_ms"] / item["calls"], 3),
+            }
+            for key, item in items
+        ]
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+query_stats = QueryStats(settings.db_query_stats_max_fingerprints)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration_ms = (time.perf_counter() - context._query_start_time) * 1000
+    rows = getattr(cursor, "rowcount", None)
+    key, normalized = fingerprint(statement)
+
+    query_stats.record(key, normalized, duration_ms, rows)
+
+    if duration_ms >= settings.db_slow_query_ms:
+        logger.warning(
+            f"[DB][QUERY][SLOW] fingerprint={key} duration_ms={duration_ms:.2f} rows={rows} sql={normalized}"
+        )
+    elif settings.db_query_sample_rate and random.random() < settings.db_query_sample_rate:
+        logger.info(f"[DB][QUERY] fingerprint={key} duration_ms={duration_ms:.2f} rows={rows} sql={normalized}")
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach query timing hooks to a (sync) engine, e.g. AsyncEngine.sync_engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
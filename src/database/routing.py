@@ -0,0 +1,85 @@
+import itertools
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# session.info flag: once set, every statement of the session goes to the primary
+PRIMARY_PINNED = "pinned_to_primary"
+
+
+class ReplicaSet:
+    """
+    Read replicas with round-robin balancing.
+
+    A replica whose connection fails is taken out of rotation for
+    `settings.db_replica_cooldown` seconds; reads fall back to the primary
+    while no replica is available.
+    """
+
+    def __init__(self, engines: Optional[list[Engine]] = None):
+        self.engines: list[Engine] = list(engines or [])
+        self._down_until: dict[Engine, float] = {}
+        self._counter = itertools.count()
+
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def choose(self) -> Optional[Engine]:
+        """Return the next healthy replica, or None if all of them are down."""
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self._counter) % len(self.engines)]
+            if self._down_until.get(engine, 0.0) <= now:
+                return engine
+        return None
+
+    def mark_down(self, engine: Engine) -> None:
+        self._down_until[engine] = time.monotonic() + settings.db_replica_cooldown
+        logger.warning(f"[DB][REPLICA] {engine.url.host} marked down for {settings.db_replica_cooldown}s")
+
+    def _on_error(self, context) -> None:
+        # connection is None when the failure happened while connecting
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a read replica.
+
+    Flushes, DML, SELECT ... FOR UPDATE and textual statements use the primary
+    (the session's own bind). After the first write the session is pinned to
+    the primary, so a request always reads its own writes.
+    """
+
+    replicas: ReplicaSet = ReplicaSet()
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get(PRIMARY_PINNED) or not self.replicas:
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+        if self._flushing or not _is_plain_select(clause):
+            self.info[PRIMARY_PINNED] = True
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+        return self.replicas.choose() or super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def _is_plain_select(clause) -> bool:
+    return getattr(clause, "is_select", False) and getattr(clause, "_for_update_arg", None) is None
+
+
+def use_primary(session) -> None:
+    """Route all further statements of a (sync or async) session to the primary."""
+    session.info[PRIMARY_PINNED] = True
@@ -0,0 +1,46 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.routing import use_primary
+
+# session.info key holding the nesting depth of active units of work
+_DEPTH_KEY = "unit_of_work_depth"
+
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    """Return True if a UnitOfWork currently owns the session's transaction."""
+    return session.info.get(_DEPTH_KEY, 0) > 0
+
+
+class UnitOfWork:
+    """
+    Transaction boundary spanning several repositories.
+
+    Inside `async with uow:` repository writes only flush; the outermost block
+    commits once on success and rolls back on error. Blocks may be nested.
+    Reads inside the block go to the primary, like the writes.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self.session.info[_DEPTH_KEY] = self.session.info.get(_DEPTH_KEY, 0) + 1
+        use_primary(self.session)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        depth = self.session.info[_DEPTH_KEY] - 1
+        self.session.info[_DEPTH_KEY] = depth
+        if depth:
+            return False
+
+        if exc_type is not None:
+            await self.session.rollback()
+            return False
+
+        try:
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        return False
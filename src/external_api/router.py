@@ -13,11 +13,11 @@ router = APIRouter(prefix="/external", tags=["External API"])
 
 
 @router.get("/fact", response_model=CatFactModel)
-def get_cat_fact() -> CatFactModel:
+async def get_cat_fact() -> CatFactModel:
     logger.info("[EXTERNAL][FACT] Request cat fact")
 
     try:
-        result = service.get_cat_fact()
+        result = await service.get_cat_fact()
         logger.info("[EXTERNAL][FACT] Success")
         return result
 
@@ -28,11 +28,11 @@ def get_cat_fact() -> CatFactModel:
 
 
 @router.get("/image", response_model=CatImageModel)
-def get_cat_image() -> CatImageModel:
+async def get_cat_image() -> CatImageModel:
     logger.info("[EXTERNAL][IMAGE] Request cat image")
 
     try:
-        result = service.get_cat_image()
+        result = await service.get_cat_image()
         logger.info("[EXTERNAL][IMAGE] Success")
         return result
 
@@ -43,11 +43,11 @@ def get_cat_image() -> CatImageModel:
 
 
 @router.get("/cat", response_model=CatCombinedModel)
-def get_cat_info() -> CatCombinedModel:
+async def get_cat_info() -> CatCombinedModel:
     logger.info("[EXTERNAL][CAT] Request combined cat fact + image")
 
     try:
-        result = service.get_cat_info()
+        result = await service.get_cat_info()
         logger.info("[EXTERNAL][CAT] Success")
         return result
 
@@ -58,11 +58,11 @@ def get_cat_info() -> CatCombinedModel:
 
 
 @router.get("/cat/html", response_class=HTMLResponse)
-def get_cat_html() -> str:
+async def get_cat_html() -> str:
     logger.info("[EXTERNAL][CAT HTML] Request cat HTML page")
 
     try:
-        result = service.get_cat_info()
+        result = await service.get_cat_info()
 
         logger.info("[EXTERNAL][CAT HTML] Success")
 
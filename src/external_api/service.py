@@ -1,10 +1,10 @@
 import asyncio
 import logging
 
-import requests
 import sentry_sdk
 
-from src.cache.service import cache_get, cache_set
+from src.cache.service import cache_get, cache_get_or_fetch, cache_set
+from src.core.http_client import get_http_client
 from src.external_api.models import CatCombinedModel, CatFactModel, CatImageModel
 from src.settings import settings
 
@@ -17,34 +17,53 @@ class CatService:
     fact_url: str = "https://catfact.ninja/fact"
     image_url: str = "https://api.thecatapi.com/v1/images/search"
 
-    def get_cat_fact(self) -> CatFactModel:
-        logger.info("[EXTERNAL][FACT] Fetching cat fact")
+    fact_cache_key: str = "cache:external:cat_fact"
+    image_cache_key: str = "cache:external:cat_image"
+
+    # Long-lived "last known good" copies used when an upstream fails in get_cat_info
+    fact_fallback_key: str = "cache:external:cat_fact:fallback"
+    image_fallback_key: str = "cache:external:cat_image:fallback"
 
-        cache_key = "cache:external:cat_fact"
+    async def _fetch_json(self, url: str):
+        """GET a JSON document through the shared pooled HTTP client."""
+        response = await get_http_client().get(url)
+        response.raise_for_status()
+        return response.json()
 
+    async def _store_fallback(self, fallback_key: str, data: dict, tag: str) -> None:
+        """Refresh the long-lived fallback copy of a fresh upstream result."""
         try:
-            cached = asyncio.run(cache_get(cache_key))
-            if cached:
-                logger.info("[EXTERNAL][FACT] Cache HIT")
-                return CatFactModel(**cached)
-            logger.info("[EXTERNAL][FACT] Cache MISS")
+            await cache_set(fallback_key, data, settings.external_fallback_TTL)
         except Exception as e:
-            logger.error(f"[EXTERNAL][FACT] Cache error: {e}")
+            logger.error(f"[EXTERNAL][{tag}] Fallback cache save error: {e}")
             sentry_sdk.capture_exception(e)
 
-        try:
-            response = requests.get(self.fact_url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            logger.info("[EXTERNAL][FACT] API success")
-
-            try:
-                asyncio.run(cache_set(cache_key, data, settings.redis_TTL))
-                logger.info("[EXTERNAL][FACT] Cached fact OK")
-            except Exception as e:
-                logger.error(f"[EXTERNAL][FACT] Cache save error: {e}")
-                sentry_sdk.capture_exception(e)
+    async def _fetch_fact(self) -> dict:
+        data = await self._fetch_json(self.fact_url)
+        logger.info("[EXTERNAL][FACT] API success")
+
+        await self._store_fallback(self.fact_fallback_key, data, "FACT")
+        return data
+
+    async def _fetch_image(self) -> dict:
+        data = await self._fetch_json(self.image_url)
+        logger.info("[EXTERNAL][IMAGE] API success")
+
+        image = {"url": data[0]["url"]}
+        await self._store_fallback(self.image_fallback_key, image, "IMAGE")
+        return image
 
+    async def get_cat_fact(self) -> CatFactModel:
+        logger.info("[EXTERNAL][FACT] Fetching cat fact")
+
+        try:
+            data = await cache_get_or_fetch(
+                self.fact_cache_key,
+                self._fetch_fact,
+                ttl=settings.redis_TTL + settings.external_stale_TTL,
+                stale_key=self.fact_fallback_key,
+                soft_ttl=settings.redis_TTL if settings.external_stale_TTL else None,
+            )
             return CatFactModel(**data)
 
         except Exception as e:
@@ -52,53 +71,75 @@ class CatService:
             sentry_sdk.capture_exception(e)
             raise
 
-    def get_cat_image(self) -> CatImageModel:
+    async def get_cat_image(self) -> CatImageModel:
         logger.info("[EXTERNAL][IMAGE] Fetching cat image")
 
-        cache_key = "cache:external:cat_image"
-
         try:
-            cached = asyncio.run(cache_get(cache_key))
-            if cached:
-                logger.info("[EXTERNAL][IMAGE] Cache HIT")
-                return CatImageModel(**cached)
-            logger.info("[EXTERNAL][IMAGE] Cache MISS")
+            data = await cache_get_or_fetch(
+                self.image_cache_key,
+                self._fetch_image,
+                ttl=settings.redis_TTL + settings.external_stale_TTL,
+                stale_key=self.image_fallback_key,
+                soft_ttl=settings.redis_TTL if settings.external_stale_TTL else None,
+            )
+            return CatImageModel(**data)
+
         except Exception as e:
-            logger.error(f"[EXTERNAL][IMAGE] Cache error: {e}")
+            logger.exception("[EXTERNAL][IMAGE] API error")
             sentry_sdk.capture_exception(e)
+            raise
 
-        try:
-            response = requests.get(self.image_url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            logger.info("[EXTERNAL][IMAGE] API success")
-
-            try:
-                asyncio.run(cache_set(cache_key, data, settings.redis_TTL))
-                logger.info("[EXTERNAL][IMAGE] Cached image OK")
-            except Exception as e:
-                logger.error(f"[EXTERNAL][IMAGE] Cache save error: {e}")
-                sentry_sdk.capture_exception(e)
+    async def _resolve(self, task: asyncio.Task, fallback_key: str, model, tag: str):
+        """
+        Return the task result, or the fallback copy if the task failed
+        or did not finish before the deadline.
+        """
+        if task.done() and not task.cancelled() and task.exception() is None:
+            return task.result()
 
-            return CatImageModel(url=data[0]["url"])
+        error = task.exception() if task.done() and not task.cancelled() else TimeoutError("deadline exceeded")
+        logger.warning(f"[EXTERNAL][CAT] {tag} unavailable ({error!r}), trying fallback")
 
+        try:
+            cached = await cache_get(fallback_key)
         except Exception as e:
-            logger.exception("[EXTERNAL][IMAGE] API error")
-            sentry_sdk.capture_exception(e)
-            raise
+            logger.error(f"[EXTERNAL][CAT] {tag} fallback cache error: {e}")
+            cached = None
+
+        if not cached:
+            raise error
 
-    def get_cat_info(self) -> CatCombinedModel:
+        logger.info(f"[EXTERNAL][CAT] {tag} served from fallback")
+        return model(**cached)
+
+    async def get_cat_info(self) -> CatCombinedModel:
+        """
+        Fetch fact and image concurrently under a shared deadline.
+        A part that fails or times out is served from its fallback copy.
+        """
         logger.info("[EXTERNAL][CAT] Fetching combined info")
 
+        fact_task = asyncio.create_task(self.get_cat_fact())
+        image_task = asyncio.create_task(self.get_cat_image())
+
         try:
-            fact = self.get_cat_fact()
-            image = self.get_cat_image()
+            _, pending = await asyncio.wait({fact_task, image_task}, timeout=settings.external_deadline)
+            for task in pending:
+                task.cancel()
+
+            fact, image = await asyncio.gather(
+                self._resolve(fact_task, self.fact_fallback_key, CatFactModel, "FACT"),
+                self._resolve(image_task, self.image_fallback_key, CatImageModel, "IMAGE"),
+            )
             logger.info("[EXTERNAL][CAT] Combined info success")
             return CatCombinedModel(fact=fact.fact, image_url=image.url)
         except Exception as e:
             logger.exception("[EXTERNAL][CAT] Combined info error")
             sentry_sdk.capture_exception(e)
             raise
+        finally:
+            for task in (fact_task, image_task):
+                task.cancel()
 
 
 service = CatService()
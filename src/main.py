@@ -6,13 +6,19 @@ from alembic.config import Config
 from fastapi import FastAPI
 
 from src.cache import router as cache_router
+from src.cache.service import start_invalidation_listener, stop_invalidation_listener
 from src.cat_facts import router as cat_fact_router
+from src.cat_facts.stats_buffer import stats_buffer
 from src.core import router as common_routes
+from src.core.http_client import close_http_client, init_http_client
 from src.core.logging.logging_config import setup_logging
 from src.core.logging.sentry import init_sentry
-from src.database.base import _init_db_models  # noqa
+from src.core.redis_client import close_redis, init_redis
+from src.database.base import _init_db_models, close_db_engine  # noqa
 from src.external_api import router as external_router
+from src.settings import settings
 from src.storage import router as storage_router
+from src.storage.config import azure_config
 
 
 def run_migrations():
@@ -26,7 +32,19 @@ async def lifespan(app: FastAPI):
     setup_logging()
     # # Initialize DB tables on startup
     # await _init_db_models()
+    if init_redis():
+        start_invalidation_listener()
+        stats_buffer.start()
+    init_http_client()
+    if settings.storage_backend == "azure":
+        azure_config.init()
     yield
+    await azure_config.close()
+    await close_http_client()
+    await stats_buffer.stop()
+    await stop_invalidation_listener()
+    await close_redis()
+    await close_db_engine()
 
 
 if os.getenv("TESTING") != "1":
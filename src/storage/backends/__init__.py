@@ -0,0 +1,30 @@
+from typing import Optional
+
+from src.settings import settings
+
+from .azure_blob import AzureBlobBackend
+from .base import FileInfo, StorageBackend
+from .local_disk import LocalDiskBackend, LocalFileStream
+
+__all__ = [
+    "AzureBlobBackend",
+    "FileInfo",
+    "LocalDiskBackend",
+    "LocalFileStream",
+    "StorageBackend",
+    "get_storage_backend",
+]
+
+_backend: Optional[StorageBackend] = None
+
+
+def get_storage_backend() -> StorageBackend:
+    """Return the process-wide backend selected by settings.storage_backend ("azure" or "local")."""
+    global _backend
+
+    if _backend is None:
+        if settings.storage_backend == "local":
+            _backend = LocalDiskBackend(settings.storage_local_root)
+        else:
+            _backend = AzureBlobBackend()
+    return _backend
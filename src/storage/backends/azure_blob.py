@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import uuid
+from typing import AsyncIterator, Optional
+
+from azure.core import MatchConditions
+from azure.core.exceptions import HttpResponseError, ResourceModifiedError, ResourceNotFoundError
+from azure.storage.blob import BlobProperties, ContentSettings
+from azure.storage.blob.aio import ContainerClient
+from fastapi import UploadFile
+
+from src.settings import settings
+
+from ..config import azure_config
+from ..utils import FileChangedError, InvalidContinuationToken, make_block_id
+from .base import FileInfo
+
+logger = logging.getLogger(__name__)
+
+
+class AzureBlobBackend:
+    """Azure Blob Storage backend on the async SDK and the shared client from azure_config."""
+
+    @property
+    def container_client(self) -> ContainerClient:
+        return azure_config.container_client
+
+    async def upload(self, filename: str, file: UploadFile, content_type: Optional[str] = None) -> None:
+        """
+        Small files go up in a single request. Larger ones are split into blocks of
+        settings.storage_block_size that are staged concurrently (at most
+        settings.storage_upload_concurrency in flight, so memory stays bounded)
+        and committed as one block list.
+        """
+        blob_client = self.container_client.get_blob_client(filename)
+        content_settings = ContentSettings(content_type=content_type)
+
+        first = await file.read(settings.storage_block_size)
+        if len(first) < settings.storage_block_size:
+            await blob_client.upload_blob(first, overwrite=True, content_settings=content_settings)
+            return
+
+        block_ids = await self._stage_blocks(blob_client, file, first)
+        await blob_client.commit_block_list(block_ids, content_settings=content_settings)
+        logger.info(f"[STORAGE][UPLOAD] {filename} committed ({len(block_ids)} blocks)")
+
+    @staticmethod
+    async def _stage_blocks(blob_client, file: UploadFile, first: bytes) -> list[str]:
+        upload_id = uuid.uuid4().hex
+        semaphore = asyncio.Semaphore(settings.storage_upload_concurrency)
+        block_ids: list[str] = []
+
+        async def stage(block_id: str, data: bytes) -> None:
+            try:
+                # validate_content sends a per-block MD5 that Azure verifies on receipt
+                await blob_client.stage_block(block_id, data, validate_content=True)
+            finally:
+                semaphore.release()
+
+        # a failing block cancels the TaskGroup, including the read loop
+        async with asyncio.TaskGroup() as group:
+            data = first
+            while data:
+                await semaphore.acquire()
+                block_id = make_block_id(upload_id, len(block_ids))
+                block_ids.append(block_id)
+                group.create_task(stage(block_id, data))
+                data = await file.read(settings.storage_block_size)
+
+        return block_ids
+
+    @staticmethod
+    def _to_info(properties: BlobProperties) -> FileInfo:
+        return FileInfo(
+            name=properties.name,
+            size=properties.size,
+            etag=properties.etag,
+            last_modified=properties.last_modified,
+            content_type=properties.content_settings.content_type,
+        )
+
+    async def list_page(
+        self, prefix: Optional[str] = None, limit: int = 100, token: Optional[str] = None
+    ) -> tuple[list[FileInfo], Optional[str]]:
+        """One List Blobs request; the token is Azure's continuation marker."""
+        pages = self.container_client.list_blobs(name_starts_with=prefix, results_per_page=limit).by_page(
+            continuation_token=token
+        )
+        try:
+            async for page in pages:
+                return [self._to_info(blob) async for blob in page], pages.continuation_token or None
+        except HttpResponseError as e:
+            if e.status_code == 400 and token:
+                raise InvalidContinuationToken(f"Invalid continuation token '{token}'")
+            raise
+        return [], None
+
+    async def get_info(self, filename: str) -> FileInfo:
+        blob_client = self.container_client.get_blob_client(filename)
+        try:
+            return self._to_info(await blob_client.get_blob_properties())
+        except ResourceNotFoundError:
+            raise FileNotFoundError(f"File '{filename}' not found")
+
+    async def open_stream(
+        self, filename: str, offset: int = 0, length: Optional[int] = None, etag: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Start downloading a file (or a byte range of it) and return an iterator over
+        its chunks; at most one chunk of settings.storage_chunk_size is held in memory.
+        """
+        blob_client = self.container_client.get_blob_client(filename)
+        conditions = {"etag": etag, "match_condition": MatchConditions.IfNotModified} if etag else {}
+        try:
+            downloader = await blob_client.download_blob(offset=offset, length=length, **conditions)
+        except ResourceNotFoundError:
+            raise FileNotFoundError(f"File '{filename}' not found")
+        except ResourceModifiedError:
+            raise FileChangedError(f"File '{filename}' was modified")
+        return downloader.chunks()
+
+    async def delete(self, filename: str) -> None:
+        blob_client = self.container_client.get_blob_client(filename)
+        try:
+            await blob_client.delete_blob()
+        except ResourceNotFoundError:
+            raise FileNotFoundError(f"File '{filename}' not found")
+
+    async def stage_block(self, filename: str, block_id: str, data: bytes) -> None:
+        blob_client = self.container_client.get_blob_client(filename)
+        await blob_client.stage_block(block_id, data, validate_content=True)
+
+    async def staged_block_ids(self, filename: str) -> list[str]:
+        blob_client = self.container_client.get_blob_client(filename)
+        try:
+            _, uncommitted = await blob_client.get_block_list("uncommitted")
+        except ResourceNotFoundError:
+            # the blob does not exist until a block has been staged or committed
+            return []
+        return [block.id for block in uncommitted]
+
+    async def commit_blocks(self, filename: str, block_ids: list[str], content_type: Optional[str] = None) -> None:
+        blob_client = self.container_client.get_blob_client(filename)
+        await blob_client.commit_block_list(block_ids, content_settings=ContentSettings(content_type=content_type))
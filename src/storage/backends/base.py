@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Optional, Protocol
+
+from fastapi import UploadFile
+
+
+@dataclass
+class FileInfo:
+    """Backend-independent file properties."""
+
+    name: str
+    size: int
+    etag: str
+    last_modified: Optional[datetime] = None
+    content_type: Optional[str] = None
+
+
+class StorageBackend(Protocol):
+    """
+    Operations the storage service needs from a backend.
+
+    Missing files raise FileNotFoundError; a file that changed while being read
+    against an etag raises FileChangedError; an unusable listing token raises
+    InvalidContinuationToken.
+    """
+
+    async def upload(self, filename: str, file: UploadFile, content_type: Optional[str] = None) -> None: ...
+
+    async def list_page(
+        self, prefix: Optional[str] = None, limit: int = 100, token: Optional[str] = None
+    ) -> tuple[list[FileInfo], Optional[str]]:
+        """Return up to limit files in name order and the token for the next page (None at the end)."""
+        ...
+
+    async def get_info(self, filename: str) -> FileInfo: ...
+
+    async def open_stream(
+        self, filename: str, offset: int = 0, length: Optional[int] = None, etag: Optional[str] = None
+    ) -> AsyncIterator[bytes]: ...
+
+    async def delete(self, filename: str) -> None: ...
+
+    async def stage_block(self, filename: str, block_id: str, data: bytes) -> None: ...
+
+    async def staged_block_ids(self, filename: str) -> list[str]: ...
+
+    async def commit_blocks(self, filename: str, block_ids: list[str], content_type: Optional[str] = None) -> None: ...
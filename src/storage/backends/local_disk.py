@@ -0,0 +1,223 @@
+import bisect
+import hashlib
+import mimetypes
+import mmap
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import aiofiles
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from src.settings import settings
+
+from ..utils import FileChangedError, decode_name_token, encode_name_token
+from .base import FileInfo
+
+# Hidden entries under the root: staged blocks and in-progress temp files
+STAGING_DIR = ".uploads"
+TEMP_PREFIX = ".tmp-"
+
+
+def _etag(stat: os.stat_result) -> str:
+    # a replaced file gets a new inode and mtime, so the etag changes with the content
+    return f'"{stat.st_ino:x}-{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _to_info(name: str, stat: os.stat_result) -> FileInfo:
+    return FileInfo(
+        name=name,
+        size=stat.st_size,
+        etag=_etag(stat),
+        last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+        content_type=mimetypes.guess_type(name)[0],
+    )
+
+
+class LocalFileStream:
+    """
+    Byte range of an open file, iterated in settings.storage_chunk_size chunks
+    read through a memory map (page cache, no read() copies into Python buffers).
+
+    The open file and range are also exposed so a server with the ASGI
+    zero-copy send extension can sendfile() it directly, see responses.py.
+    """
+
+    def __init__(self, file, offset: int, count: int):
+        self.file = file
+        self.offset = offset
+        self.count = count
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._chunks()
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        try:
+            if not self.count:
+                return
+            with mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                position, end = self.offset, self.offset + self.count
+                while position < end:
+                    chunk_end = min(position + settings.storage_chunk_size, end)
+                    # slicing may page in from disk, keep it off the event loop
+                    yield await run_in_threadpool(mapped.__getitem__, slice(position, chunk_end))
+                    position = chunk_end
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class LocalDiskBackend:
+    """
+    Files stored under a local directory; blob names may contain "/" for subdirectories.
+
+    Writes go to a temp file in the target directory and are moved into place with
+    os.replace, so readers never see a partial file. Content types are not stored
+    and are guessed from the file name.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, filename: str) -> Path:
+        path = (self.root / filename).resolve()
+        relative = path.relative_to(self.root) if self.root in path.parents else None
+        if relative is None or relative.parts[0] == STAGING_DIR or path.name.startswith(TEMP_PREFIX):
+            raise FileNotFoundError(f"File '{filename}' not found")
+        return path
+
+    def _staging_path(self, filename: str) -> Path:
+        return self.root / STAGING_DIR / hashlib.sha1(filename.encode()).hexdigest()
+
+    async def _write_atomic(self, path: Path, chunks: AsyncIterator[bytes]) -> None:
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=TEMP_PREFIX)
+        os.close(fd)
+        try:
+            async with aiofiles.open(tmp_name, "wb") as tmp:
+                async for chunk in chunks:
+                    await tmp.write(chunk)
+                await tmp.flush()
+                await run_in_threadpool(os.fsync, tmp.fileno())
+            await run_in_threadpool(os.replace, tmp_name, path)
+        except BaseException:
+            await run_in_threadpool(_unlink_missing_ok, tmp_name)
+            raise
+
+    async def upload(self, filename: str, file: UploadFile, content_type: Optional[str] = None) -> None:
+        async def chunks() -> AsyncIterator[bytes]:
+            while chunk := await file.read(settings.storage_block_size):
+                yield chunk
+
+        await self._write_atomic(self._path(filename), chunks())
+
+    def _list_files(self) -> list[str]:
+        names = []
+        for directory, subdirectories, files in os.walk(self.root):
+            if Path(directory) == self.root and STAGING_DIR in subdirectories:
+                subdirectories.remove(STAGING_DIR)
+            for name in files:
+                if not name.startswith(TEMP_PREFIX):
+                    names.append((Path(directory) / name).relative_to(self.root).as_posix())
+        return sorted(names)
+
+    def _list_page(self, prefix: str, limit: int, after: Optional[str]) -> tuple[list[FileInfo], Optional[str]]:
+        names = self._list_files()
+        start = bisect.bisect_left(names, prefix)
+        if after is not None:
+            start = max(start, bisect.bisect_right(names, after))
+
+        # one extra name tells whether another page exists
+        end = start
+        while end < len(names) and end - start <= limit and names[end].startswith(prefix):
+            end += 1
+        page_names = names[start:end][:limit]
+
+        files = []
+        for name in page_names:
+            try:
+                files.append(_to_info(name, (self.root / name).stat()))
+            except FileNotFoundError:
+                # deleted since the directory walk
+                continue
+
+        more = end - start > limit
+        return files, encode_name_token(page_names[-1]) if more else None
+
+    async def list_page(
+        self, prefix: Optional[str] = None, limit: int = 100, token: Optional[str] = None
+    ) -> tuple[list[FileInfo], Optional[str]]:
+        """Directory walk in name order; the token encodes the last returned name."""
+        after = decode_name_token(token) if token else None
+        return await run_in_threadpool(self._list_page, prefix or "", limit, after)
+
+    async def get_info(self, filename: str) -> FileInfo:
+        path = self._path(filename)
+        try:
+            stat = await run_in_threadpool(path.stat)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File '{filename}' not found")
+        return _to_info(filename, stat)
+
+    async def open_stream(
+        self, filename: str, offset: int = 0, length: Optional[int] = None, etag: Optional[str] = None
+    ) -> LocalFileStream:
+        path = self._path(filename)
+        try:
+            file = await run_in_threadpool(open, path, "rb")
+        except (FileNotFoundError, IsADirectoryError):
+            raise FileNotFoundError(f"File '{filename}' not found")
+
+        # the open file keeps its inode even if the path is replaced meanwhile
+        stat = os.fstat(file.fileno())
+        if etag and etag != _etag(stat):
+            file.close()
+            raise FileChangedError(f"File '{filename}' was modified")
+
+        count = stat.st_size - offset if length is None else min(length, stat.st_size - offset)
+        return LocalFileStream(file, offset, max(count, 0))
+
+    async def delete(self, filename: str) -> None:
+        try:
+            await run_in_threadpool(os.remove, self._path(filename))
+        except (FileNotFoundError, IsADirectoryError):
+            raise FileNotFoundError(f"File '{filename}' not found")
+
+    async def stage_block(self, filename: str, block_id: str, data: bytes) -> None:
+        async def chunks() -> AsyncIterator[bytes]:
+            yield data
+
+        # block ids are base64 and may contain "/"
+        await self._write_atomic(self._staging_path(filename) / block_id.encode().hex(), chunks())
+
+    async def staged_block_ids(self, filename: str) -> list[str]:
+        staging = self._staging_path(filename)
+        if not await run_in_threadpool(staging.is_dir):
+            return []
+        names = await run_in_threadpool(os.listdir, staging)
+        return [bytes.fromhex(name).decode() for name in names if not name.startswith(TEMP_PREFIX)]
+
+    async def commit_blocks(self, filename: str, block_ids: list[str], content_type: Optional[str] = None) -> None:
+        path = self._path(filename)
+        staging = self._staging_path(filename)
+
+        async def chunks() -> AsyncIterator[bytes]:
+            for block_id in block_ids:
+                async with aiofiles.open(staging / block_id.encode().hex(), "rb") as block:
+                    while chunk := await block.read(settings.storage_chunk_size):
+                        yield chunk
+
+        await self._write_atomic(path, chunks())
+        # like Azure, uncommitted blocks are discarded on commit
+        await run_in_threadpool(shutil.rmtree, staging, ignore_errors=True)
+
+
+def _unlink_missing_ok(path: str) -> None:
+    Path(path).unlink(missing_ok=True)
@@ -1,31 +1,68 @@
+import logging
 import os
-from functools import cached_property
 
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob.aio import BlobServiceClient, ContainerClient
 from dotenv import load_dotenv
 
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
 
 class AzureConfig:
-    """Configuration class for connecting to Azure Blob Storage."""
+    """
+    Configuration and shared async clients for Azure Blob Storage.
+
+    The clients keep one aiohttp connection pool per process; they are created
+    in the FastAPI lifespan (or lazily on first use) and closed on shutdown.
+    """
 
     def __init__(self):
         load_dotenv()
         self.connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
         self.container_name = os.getenv("AZURE_CONTAINER_NAME")
+        self._blob_service_client: BlobServiceClient | None = None
+        self._container_client: ContainerClient | None = None
+
+    def init(self) -> BlobServiceClient | None:
+        """
+        Create the shared BlobServiceClient; None if no connection string is configured.
+        Should be called inside FastAPI lifespan.
+        """
+        if not self.connection_string:
+            logger.warning("[STORAGE][INIT] AZURE_STORAGE_CONNECTION_STRING is not set")
+            return None
+
+        client = self.blob_service_client
+        logger.info("[STORAGE][INIT] Client ready")
+        return client
+
+    async def close(self) -> None:
+        """Close the shared client and its connection pool."""
+        if self._blob_service_client is None:
+            return
+
+        await self._blob_service_client.close()
         self._blob_service_client = None
         self._container_client = None
+        logger.info("[STORAGE][CLOSE] Client closed")
 
-    @cached_property
-    def blob_service_client(self):
-        """Initialize and return the Azure BlobServiceClient."""
-        if not self._blob_service_client:
-            self._blob_service_client = BlobServiceClient.from_connection_string(self.connection_string)
+    @property
+    def blob_service_client(self) -> BlobServiceClient:
+        """Return the shared BlobServiceClient, creating it lazily outside the lifespan."""
+        if self._blob_service_client is None:
+            self._blob_service_client = BlobServiceClient.from_connection_string(
+                self.connection_string,
+                # downloads are fetched one chunk per request, bounding memory per stream
+                max_single_get_size=settings.storage_chunk_size,
+                max_chunk_get_size=settings.storage_chunk_size,
+            )
         return self._blob_service_client
 
-    @cached_property
-    def container_client(self):
+    @property
+    def container_client(self) -> ContainerClient:
         """Return the client for an existing container."""
-        if not self._container_client:
+        if self._container_client is None:
             self._container_client = self.blob_service_client.get_container_client(self.container_name)
         return self._container_client
 
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from redis.exceptions import WatchError
+
+from src.cache.service import cache_lock_acquire, cache_lock_extend, cache_lock_release
+from src.core.redis_client import get_redis
+from src.settings import settings
+
+from .backends import FileInfo, StorageBackend
+from .utils import decode_name_token, encode_name_token
+
+logger = logging.getLogger(__name__)
+
+# Continuation tokens of index pages carry this prefix, backend tokens never do
+INDEX_TOKEN_PREFIX = "i."
+
+# Files fetched per backend request while (re)building the index
+REBUILD_PAGE_SIZE = 5000
+
+# The index is refreshed after storage_list_cache_TTL but stays readable this many TTLs,
+# so readers keep using it while a refresh runs
+INDEX_LIFETIME_FACTOR = 10
+
+# Seconds between checks while waiting for another worker to build a missing index
+BUILD_POLL_INTERVAL = 0.1
+
+
+def _dump(info: FileInfo) -> str:
+    return json.dumps(
+        {
+            "size": info.size,
+            "etag": info.etag,
+            "last_modified": info.last_modified.isoformat() if info.last_modified else None,
+            "content_type": info.content_type,
+        }
+    )
+
+
+def _load(name: bytes, raw: bytes) -> FileInfo:
+    data = json.loads(raw)
+    last_modified = datetime.fromisoformat(data["last_modified"]) if data["last_modified"] else None
+    return FileInfo(name.decode(), data["size"], data["etag"], last_modified, data["content_type"])
+
+
+class ListingIndex:
+    """
+    Copy of the file listing in Redis.
+
+    Names live in a sorted set with equal scores, so ZRANGEBYLEX serves prefix
+    and keyset pages; metadata lives in a hash. Once the index is older than
+    settings.storage_list_cache_TTL it is rebuilt from the backend in a
+    background task while readers keep using the old keys. Uploads and deletes
+    update the index in place and are also recorded in a changes hash, which a
+    running rebuild merges into the new keys before swapping them in.
+    """
+
+    names_key: str = "storage:index:names"
+    meta_key: str = "storage:index:meta"
+    # name -> metadata of files changed since the current rebuild started ("" for deletions)
+    changes_key: str = "storage:index:changes"
+    # unix time of the last completed build
+    built_key: str = "storage:index:built"
+
+    def __init__(self):
+        self._refresh: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _lifetime() -> int:
+        return settings.storage_list_cache_TTL * INDEX_LIFETIME_FACTOR
+
+    async def page(
+        self, backend: StorageBackend, prefix: Optional[str], limit: int, token: Optional[str]
+    ) -> Optional[tuple[list[FileInfo], Optional[str]]]:
+        """
+        Return a page from the index. A missing index is built first; None if another
+        worker is building it and the request can be served from the backend instead.
+        """
+        redis = get_redis()
+        built_at = await redis.get(self.built_key)
+        if built_at is None:
+            # index tokens can only be resumed from the index: wait for a build running elsewhere
+            if not await self._build(backend, wait=bool(token) and token.startswith(INDEX_TOKEN_PREFIX)):
+                return None
+        elif time.time() - float(built_at) >= settings.storage_list_cache_TTL:
+            self._refresh_in_background(backend)
+
+        prefix_bytes = (prefix or "").encode()
+        start = b"[" + prefix_bytes if prefix_bytes else b"-"
+        if token:
+            after = decode_name_token(token, INDEX_TOKEN_PREFIX).encode()
+            if after >= prefix_bytes:
+                start = b"(" + after
+        # no UTF-8 sequence contains 0xff, so this bounds every name that starts with the prefix
+        stop = b"[" + prefix_bytes + b"\xff" if prefix_bytes else b"+"
+
+        names = await redis.zrangebylex(self.names_key, start, stop, start=0, num=limit + 1)
+        page_names = names[:limit]
+        metas = await redis.hmget(self.meta_key, page_names) if page_names else []
+
+        files = [_load(name, raw) for name, raw in zip(page_names, metas) if raw]
+        next_token = None
+        if len(names) > limit:
+            next_token = encode_name_token(page_names[-1].decode(), INDEX_TOKEN_PREFIX)
+        return files, next_token
+
+    async def _build(self, backend: StorageBackend, wait: bool) -> bool:
+        """Build a missing index; False if another worker holds the lock and wait is off."""
+        redis = get_redis()
+        while not await self.rebuild(backend):
+            if not wait:
+                return False
+            await asyncio.sleep(BUILD_POLL_INTERVAL)
+            if await redis.exists(self.built_key):
+                break
+        return True
+
+    def _refresh_in_background(self, backend: StorageBackend) -> None:
+        """Start a rebuild unless this process is already running one (other workers are kept out by the lock)."""
+        if self._refresh is not None and not self._refresh.done():
+            return
+        self._refresh = asyncio.create_task(self._safe_rebuild(backend))
+
+    async def _safe_rebuild(self, backend: StorageBackend) -> None:
+        try:
+            await self.rebuild(backend)
+        except Exception as e:
+            logger.error(f"[STORAGE][INDEX] refresh error: {e}")
+
+    async def rebuild(self, backend: StorageBackend) -> bool:
+        """
+        Scan the backend into fresh keys and swap them in; False if another worker holds
+        the lock, or took it over because this scan outlived it.
+        """
+        lock_ttl = settings.storage_list_cache_TTL
+        lock = await cache_lock_acquire(self.names_key, lock_ttl)
+        if not lock:
+            return False
+
+        redis = get_redis()
+        # per-build keys: a build that lost its lock cannot touch the one that took over
+        tmp_names, tmp_meta = f"{self.names_key}:rebuild:{lock}", f"{self.meta_key}:rebuild:{lock}"
+        count = None
+        try:
+            # the scan below sees every change made before this point; later ones are merged by _swap
+            await redis.delete(self.changes_key)
+            token = None
+            while True:
+                files, token = await backend.list_page(None, REBUILD_PAGE_SIZE, token)
+                if files:
+                    async with redis.pipeline(transaction=False) as pipe:
+                        pipe.zadd(tmp_names, {info.name: 0 for info in files})
+                        pipe.hset(tmp_meta, mapping={info.name: _dump(info) for info in files})
+                        # left behind if this worker dies mid-scan
+                        pipe.expire(tmp_names, self._lifetime())
+                        pipe.expire(tmp_meta, self._lifetime())
+                        await pipe.execute()
+                # a large container takes many pages: keep the lock for as long as the scan runs
+                if not await cache_lock_extend(self.names_key, lock, lock_ttl):
+                    break
+                if not token:
+                    # the lock was just extended, so it outlives the swap
+                    count = await self._swap(tmp_names, tmp_meta)
+                    break
+        finally:
+            await redis.delete(tmp_names, tmp_meta)
+            await cache_lock_release(self.names_key, lock)
+
+        if count is None:
+            logger.warning("[STORAGE][INDEX] rebuild lock lost, discarding this scan")
+            return False
+        logger.info(f"[STORAGE][INDEX] rebuilt ({count} files)")
+        return True
+
+    async def _swap(self, tmp_names: str, tmp_meta: str) -> int:
+        """
+        Merge the recorded changes into the rebuilt keys and swap them in atomically.
+        Retried if a change is recorded in between; returns the number of indexed files.
+        """
+        redis = get_redis()
+        lifetime = self._lifetime()
+        async with redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(self.changes_key)
+                    changes = await pipe.hgetall(self.changes_key)
+                    if changes:
+                        async with redis.pipeline(transaction=False) as merge:
+                            for name, raw in changes.items():
+                                if raw:
+                                    merge.zadd(tmp_names, {name: 0})
+                                    merge.hset(tmp_meta, name, raw)
+                                else:
+                                    merge.zrem(tmp_names, name)
+                                    merge.hdel(tmp_meta, name)
+                            await merge.execute()
+                    count = await redis.zcard(tmp_names)
+
+                    pipe.multi()
+                    if count:
+                        pipe.rename(tmp_names, self.names_key)
+                        pipe.rename(tmp_meta, self.meta_key)
+                        pipe.expire(self.names_key, lifetime)
+                        pipe.expire(self.meta_key, lifetime)
+                    else:
+                        pipe.delete(self.names_key, self.meta_key, tmp_meta)
+                    pipe.delete(self.changes_key)
+                    pipe.set(self.built_key, time.time(), ex=lifetime)
+                    await pipe.execute()
+                    return count
+                except WatchError:
+                    continue
+
+    async def add(self, info: FileInfo) -> None:
+        """Record an uploaded file in the index and in the changes a running rebuild merges."""
+        await self._record(info.name, _dump(info))
+
+    async def remove(self, filename: str) -> None:
+        await self._record(filename, "")
+
+    async def _record(self, name: str, raw: str) -> None:
+        redis = get_redis()
+        lifetime = self._lifetime()
+        async with redis.pipeline(transaction=True) as pipe:
+            if raw:
+                pipe.zadd(self.names_key, {name: 0})
+                pipe.hset(self.meta_key, name, raw)
+            else:
+                pipe.zrem(self.names_key, name)
+                pipe.hdel(self.meta_key, name)
+            pipe.hset(self.changes_key, name, raw)
+            # keys created here (first upload after an empty build, or no index yet) must expire too
+            for key in (self.names_key, self.meta_key, self.changes_key):
+                pipe.expire(key, lifetime, nx=True)
+            await pipe.execute()
+
+
+listing_index = ListingIndex()
@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class FileOut(BaseModel):
+    """Stored file metadata."""
+
+    name: str
+    size: int
+    etag: str
+    last_modified: Optional[datetime]
+    content_type: Optional[str]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FileListPage(BaseModel):
+    """One page of a file listing in name order."""
+
+    files: list[FileOut]
+    next_token: Optional[str] = Field(None, description="Pass as `token` to fetch the next page")
+
+
+class UploadCreate(BaseModel):
+    """DTO for starting a resumable upload."""
+
+    filename: str = Field(..., min_length=1, max_length=1024, description="Target blob name")
+    content_type: Optional[str] = Field(None, description="Content type stored with the blob")
+
+
+class UploadOut(BaseModel):
+    """Resumable upload session."""
+
+    upload_id: str
+    filename: str
+    block_size: int = Field(..., description="Recommended block size in bytes")
+    max_block_size: int
+
+
+class UploadBlockOut(BaseModel):
+    """A staged block of a resumable upload."""
+
+    index: int
+    size: int
+    content_md5: str
+
+
+class UploadCommit(BaseModel):
+    """DTO for committing a resumable upload; blocks 0..block_count-1 are committed in order."""
+
+    block_count: Optional[int] = Field(
+        None, ge=1, description="Number of blocks; defaults to the highest staged index + 1"
+    )
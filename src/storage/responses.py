@@ -0,0 +1,32 @@
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from .backends import LocalFileStream
+
+# ASGI extension letting the server send a file descriptor with sendfile(2)
+ZEROCOPY_SEND = "http.response.zerocopysend"
+
+
+class FileStreamResponse(StreamingResponse):
+    """
+    StreamingResponse over storage chunks.
+
+    Local files are handed to the server for a zero-copy sendfile() when it
+    advertises the zero-copy send extension; otherwise they are streamed from
+    their memory map like any other backend's chunks.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        stream = self.body_iterator
+        if not isinstance(stream, LocalFileStream) or ZEROCOPY_SEND not in scope.get("extensions", {}):
+            await super().__call__(scope, receive, send)
+            return
+
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": ZEROCOPY_SEND, "file": stream.file, "offset": stream.offset, "count": stream.count})
+        finally:
+            stream.close()
+
+        if self.background is not None:
+            await self.background()
@@ -1,47 +1,199 @@
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+import mimetypes
+from email.utils import format_datetime
+from typing import Optional
 
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Path, Query, Request, Response, UploadFile
+
+from src.settings import settings
+
+from .models import FileListPage, UploadBlockOut, UploadCommit, UploadCreate, UploadOut
+from .responses import FileStreamResponse
 from .service import StorageService, get_storage_service
+from .utils import (
+    ChecksumMismatch,
+    FileChangedError,
+    InvalidContinuationToken,
+    MissingBlocks,
+    RangeNotSatisfiable,
+    UploadInProgress,
+    UploadNotFound,
+    etag_matches,
+    parse_range,
+)
+
+router = APIRouter(prefix="/storage", tags=["File Storage"])
+
+
+def _guess_type(filename: str) -> str:
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
 
-router = APIRouter(prefix="/storage", tags=["Azure Blob Storage"])
+
+async def _read_block(request: Request) -> bytes:
+    """Read a request body, rejecting it as soon as it exceeds the maximum block size."""
+    data = bytearray()
+    async for chunk in request.stream():
+        data += chunk
+        if len(data) > settings.storage_max_block_size:
+            raise HTTPException(status_code=413, detail=f"Block exceeds {settings.storage_max_block_size} bytes")
+    return bytes(data)
 
 
 @router.post("/files")
 async def upload_file(file: UploadFile = File(...), service: StorageService = Depends(get_storage_service)):
-    """Upload a file to Azure Blob Storage."""
+    """Upload a file to the configured storage backend."""
+    try:
+        filename = await service.upload_file(file)
+        return {"message": f"File '{filename}' successfully uploaded."}
+    except UploadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/uploads", response_model=UploadOut)
+async def create_upload(data: UploadCreate, service: StorageService = Depends(get_storage_service)):
+    """
+    Start a resumable upload.
+
+    Send the file as numbered blocks (`PUT /storage/uploads/{upload_id}/blocks/{n}`, n from 0,
+    any order, in parallel), then commit them with `POST /storage/uploads/{upload_id}/commit`.
+    Only one upload per file name can be active at a time (409 otherwise); an upload that sends
+    no block for a while gives the name up until its next block.
+    """
+    try:
+        return await service.create_upload(data.filename, data.content_type)
+    except UploadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/uploads/{upload_id}/blocks/{index}", response_model=UploadBlockOut)
+async def upload_block(
+    request: Request,
+    upload_id: str,
+    index: int = Path(..., ge=0, le=49999),
+    content_md5: Optional[str] = Header(None),
+    service: StorageService = Depends(get_storage_service),
+):
+    """
+    Stage block `index` of a resumable upload from the raw request body.
+    An optional `Content-MD5` header (base64) is verified before the block is stored.
+    """
+    try:
+        return await service.stage_upload_block(upload_id, index, await _read_block(request), content_md5)
+    except HTTPException:
+        raise
+    except UploadNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UploadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ChecksumMismatch as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/uploads/{upload_id}/commit")
+async def commit_upload(
+    upload_id: str, data: UploadCommit = UploadCommit(), service: StorageService = Depends(get_storage_service)
+):
+    """Assemble the staged blocks into the final file."""
+    try:
+        filename = await service.commit_upload(upload_id, data.block_count)
+        return {"message": f"File '{filename}' successfully uploaded."}
+    except UploadNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UploadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except MissingBlocks as e:
+        raise HTTPException(status_code=409, detail={"message": "Missing blocks", "missing": e.missing})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str, service: StorageService = Depends(get_storage_service)):
+    """Abandon a resumable upload; staged blocks are discarded with the next upload of the file."""
     try:
-        filename = service.upload_file(file)
-        return {"message": f"File '{filename}' successfully uploaded to Azure Blob Storage."}
+        await service.abort_upload(upload_id)
+        return {"message": f"Upload '{upload_id}' aborted."}
+    except UploadNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/files")
-async def list_files(service: StorageService = Depends(get_storage_service)):
-    """Return a list of all files in the container."""
+@router.get("/files", response_model=FileListPage)
+async def list_files(
+    prefix: Optional[str] = Query(None, description="Only files whose name starts with this prefix"),
+    limit: int = Query(settings.storage_list_default_limit, ge=1, le=settings.storage_list_max_limit),
+    token: Optional[str] = Query(None, description="`next_token` of the previous page"),
+    service: StorageService = Depends(get_storage_service),
+):
+    """Return one page of stored files in name order with size, ETag and last modification time."""
     try:
-        return {"files": service.list_files()}
+        return await service.list_files(prefix, limit, token)
+    except InvalidContinuationToken as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/files/{filename}")
-async def download_file(filename: str, service: StorageService = Depends(get_storage_service)):
-    """Read and return the content of a file."""
+async def download_file(
+    filename: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None),
+    service: StorageService = Depends(get_storage_service),
+):
+    """
+    Stream the raw content of a file.
+
+    Supports a single `Range` (206 Partial Content) and `If-None-Match` (304 Not Modified);
+    the ETag and content type are taken from the file properties.
+    """
     try:
-        content = service.download_file(filename)
-        return {"filename": filename, "content": content}
+        properties = await service.get_properties(filename)
+        headers = {"ETag": properties.etag, "Accept-Ranges": "bytes"}
+        if properties.last_modified:
+            headers["Last-Modified"] = format_datetime(properties.last_modified, usegmt=True)
+
+        if etag_matches(if_none_match, properties.etag):
+            return Response(status_code=304, headers=headers)
+
+        size = properties.size
+        byte_range = parse_range(range_header, size)
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1
+
+        status_code = 200
+        if byte_range:
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(length)
+
+        # empty blobs: nothing to download
+        chunks = await service.open_stream(filename, start, length, properties.etag) if length else iter(())
+        media_type = properties.content_type or _guess_type(filename)
+        return FileStreamResponse(chunks, status_code=status_code, media_type=media_type, headers=headers)
+
+    except RangeNotSatisfiable as e:
+        raise HTTPException(status_code=416, detail=str(e), headers={"Content-Range": f"bytes */{e.size}"})
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except FileChangedError as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.delete("/files/{filename}")
 async def delete_file(filename: str, service: StorageService = Depends(get_storage_service)):
-    """Delete a file from Azure Blob Storage."""
+    """Delete a file from the configured storage backend."""
     try:
-        service.delete_file(filename)
-        return {"message": f"File '{filename}' successfully deleted from Azure Blob Storage."}
+        await service.delete_file(filename)
+        return {"message": f"File '{filename}' successfully deleted."}
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -1,40 +1,228 @@
-from azure.core.exceptions import ResourceNotFoundError
+import logging
+import uuid
+from typing import AsyncIterator, Optional
 
-from .config import azure_config
+from fastapi import UploadFile
+
+from src.cache.service import (
+    cache_delete,
+    cache_get,
+    cache_lock_acquire,
+    cache_lock_extend,
+    cache_lock_release,
+    cache_set,
+)
+from src.settings import settings
+
+from .backends import FileInfo, StorageBackend, get_storage_backend
+from .listing import INDEX_TOKEN_PREFIX, listing_index
+from .models import FileListPage, FileOut, UploadBlockOut, UploadOut
+from .utils import (
+    InvalidContinuationToken,
+    MissingBlocks,
+    UploadInProgress,
+    UploadNotFound,
+    make_block_id,
+    parse_block_id,
+    verify_md5,
+)
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_SESSION_KEY = "storage:uploads:{upload_id}"
+# one upload per file name at a time: blocks are staged on the target blob, so a commit or a plain
+# upload drops other sessions' blocks. Held for settings.storage_upload_lock_TTL, renewed by each block.
+UPLOAD_FILE_LOCK = "storage:uploads:file:{filename}"
 
 
 class StorageService:
-    """Business logic for working with Azure Blob Storage."""
+    """Business logic for file storage; the backend (Azure or local disk) comes from settings."""
 
-    def __init__(self):
-        self.container_client = azure_config.container_client
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        self.backend = backend or get_storage_backend()
+
+    async def upload_file(self, file: UploadFile) -> str:
+        """
+        Upload a file, streaming it from the request.
+        Raises UploadInProgress while a resumable upload to the same file name is open.
+        """
+        lock_key = UPLOAD_FILE_LOCK.format(filename=file.filename)
+        try:
+            lock_token = await cache_lock_acquire(lock_key, settings.storage_upload_lock_TTL)
+        except Exception as e:
+            # resumable uploads cannot run without the cache either, so none can be disturbed
+            logger.error(f"[STORAGE][UPLOAD] lock error, uploading {file.filename} unlocked: {e}")
+            lock_token = ""
+        if lock_token is None:
+            raise UploadInProgress(f"An upload to '{file.filename}' is already in progress")
+        try:
+            await self.backend.upload(file.filename, file, file.content_type)
+        finally:
+            if lock_token:
+                try:
+                    await cache_lock_release(lock_key, lock_token)
+                except Exception as e:
+                    logger.error(f"[STORAGE][UPLOAD] lock release error for {file.filename}: {e}")
 
-    def upload_file(self, file):
-        """Upload file to Azure container."""
-        blob_client = self.container_client.get_blob_client(file.filename)
-        blob_client.upload_blob(file.file, overwrite=True)
+        await self._index_file(file.filename)
         return file.filename
 
-    def list_files(self):
-        """List all blobs in the container."""
-        return [blob.name for blob in self.container_client.list_blobs()]
+    async def list_files(
+        self, prefix: Optional[str] = None, limit: int = 100, token: Optional[str] = None
+    ) -> FileListPage:
+        """
+        Return one page of files in name order, optionally restricted to a name prefix.
+        With settings.storage_list_cache the page comes from the Redis listing index.
+        """
+        page = None
+        if settings.storage_list_cache:
+            try:
+                page = await listing_index.page(self.backend, prefix, limit, token)
+            except InvalidContinuationToken:
+                raise
+            except Exception as e:
+                logger.error(f"[STORAGE][INDEX] read error, listing from backend: {e}")
 
-    def download_file(self, filename: str) -> str:
-        """Download the content of a file by name."""
-        blob_client = self.container_client.get_blob_client(filename)
+        if page is None:
+            if token and token.startswith(INDEX_TOKEN_PREFIX):
+                raise InvalidContinuationToken("Listing index unavailable, restart the listing without a token")
+            page = await self.backend.list_page(prefix, limit, token)
+
+        files, next_token = page
+        return FileListPage(files=[FileOut.model_validate(info) for info in files], next_token=next_token)
+
+    async def _index_file(self, filename: str) -> None:
+        if not settings.storage_list_cache:
+            return
         try:
-            stream = blob_client.download_blob()
-            return stream.readall().decode("utf-8", errors="ignore")
-        except ResourceNotFoundError:
-            raise FileNotFoundError(f"File '{filename}' not found")
-
-    def delete_file(self, filename: str):
-        """Delete a file from the container."""
-        blob_client = self.container_client.get_blob_client(filename)
+            await listing_index.add(await self.backend.get_info(filename))
+        except Exception as e:
+            logger.error(f"[STORAGE][INDEX] update error: {e}")
+
+    async def get_properties(self, filename: str) -> FileInfo:
+        """Return size, etag, last modification time and content type of a file."""
+        return await self.backend.get_info(filename)
+
+    async def open_stream(
+        self, filename: str, offset: int = 0, length: Optional[int] = None, etag: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Start reading a file (or a byte range of it) and return an iterator over its
+        chunks; at most one chunk of settings.storage_chunk_size is held in memory.
+        If etag is given, FileChangedError is raised instead of mixing two versions of the file.
+        """
+        return await self.backend.open_stream(filename, offset, length, etag)
+
+    async def delete_file(self, filename: str) -> None:
+        """Delete a file."""
+        await self.backend.delete(filename)
+
+        if settings.storage_list_cache:
+            try:
+                await listing_index.remove(filename)
+            except Exception as e:
+                logger.error(f"[STORAGE][INDEX] update error: {e}")
+
+    async def _get_upload(self, upload_id: str) -> dict:
+        upload = await cache_get(UPLOAD_SESSION_KEY.format(upload_id=upload_id))
+        if not upload:
+            raise UploadNotFound(f"Upload '{upload_id}' not found")
+        return upload
+
+    async def create_upload(self, filename: str, content_type: Optional[str] = None) -> UploadOut:
+        """
+        Start a resumable upload; its metadata is kept in the cache until commit or abort.
+        Raises UploadInProgress while another upload to the same file name is active.
+        """
+        lock_key = UPLOAD_FILE_LOCK.format(filename=filename)
+        lock_token = await cache_lock_acquire(lock_key, settings.storage_upload_lock_TTL)
+        if not lock_token:
+            raise UploadInProgress(f"An upload to '{filename}' is already in progress")
+
+        upload_id = uuid.uuid4().hex
+        upload = {"filename": filename, "content_type": content_type, "lock_token": lock_token}
         try:
-            blob_client.delete_blob()
-        except ResourceNotFoundError:
-            raise FileNotFoundError(f"File '{filename}' not found")
+            await cache_set(UPLOAD_SESSION_KEY.format(upload_id=upload_id), upload, settings.storage_upload_TTL)
+        except Exception:
+            await cache_lock_release(lock_key, lock_token)
+            raise
+
+        return UploadOut(
+            upload_id=upload_id,
+            filename=filename,
+            block_size=settings.storage_block_size,
+            max_block_size=settings.storage_max_block_size,
+        )
+
+    async def stage_upload_block(
+        self, upload_id: str, index: int, data: bytes, content_md5: Optional[str] = None
+    ) -> UploadBlockOut:
+        """
+        Stage one block of a resumable upload. Re-sending a block replaces it.
+        The block is checked against the client's Content-MD5 (Azure verifies it again on receipt).
+        """
+        upload = await self._get_upload(upload_id)
+        digest = verify_md5(data, content_md5)
+
+        await self._hold_file_name(upload_id, upload)
+        await self.backend.stage_block(upload["filename"], make_block_id(upload_id, index), data)
+        return UploadBlockOut(index=index, size=len(data), content_md5=digest)
+
+    async def commit_upload(self, upload_id: str, block_count: Optional[int] = None) -> str:
+        """Commit blocks 0..block_count-1 of a resumable upload; raises MissingBlocks on gaps."""
+        upload = await self._get_upload(upload_id)
+        await self._hold_file_name(upload_id, upload)
+
+        staged = set()
+        for block_id in await self.backend.staged_block_ids(upload["filename"]):
+            try:
+                block_upload_id, index = parse_block_id(block_id)
+            except ValueError:
+                # staged by another client of the container
+                continue
+            if block_upload_id == upload_id:
+                staged.add(index)
+
+        if block_count is None:
+            block_count = max(staged, default=-1) + 1
+        missing = [index for index in range(block_count) if index not in staged]
+        if missing or not block_count:
+            raise MissingBlocks(missing or [0])
+
+        block_ids = [make_block_id(upload_id, index) for index in range(block_count)]
+        await self.backend.commit_blocks(upload["filename"], block_ids, upload["content_type"])
+        await self._close_upload(upload_id, upload)
+        await self._index_file(upload["filename"])
+
+        logger.info(f"[STORAGE][UPLOAD] {upload['filename']} committed ({block_count} blocks, upload {upload_id})")
+        return upload["filename"]
+
+    async def _hold_file_name(self, upload_id: str, upload: dict) -> None:
+        """
+        Renew the session's lock on its file name, retaking it if it lapsed while the upload
+        was idle; raises UploadInProgress if another upload has taken the name meanwhile.
+        """
+        lock_key = UPLOAD_FILE_LOCK.format(filename=upload["filename"])
+        ttl = settings.storage_upload_lock_TTL
+        if upload.get("lock_token") and await cache_lock_extend(lock_key, upload["lock_token"], ttl):
+            return
+
+        lock_token = await cache_lock_acquire(lock_key, ttl)
+        if not lock_token:
+            raise UploadInProgress(f"Another upload to '{upload['filename']}' has started since this one went idle")
+        upload["lock_token"] = lock_token
+        await cache_set(UPLOAD_SESSION_KEY.format(upload_id=upload_id), upload, settings.storage_upload_TTL)
+
+    async def abort_upload(self, upload_id: str) -> None:
+        """Drop a resumable upload session so the file name can be uploaded again."""
+        upload = await self._get_upload(upload_id)
+        await self._close_upload(upload_id, upload)
+        logger.info(f"[STORAGE][UPLOAD] {upload['filename']} aborted (upload {upload_id})")
+
+    async def _close_upload(self, upload_id: str, upload: dict) -> None:
+        await cache_delete([UPLOAD_SESSION_KEY.format(upload_id=upload_id)])
+        if upload.get("lock_token"):
+            await cache_lock_release(UPLOAD_FILE_LOCK.format(filename=upload["filename"]), upload["lock_token"])
 
 
 def get_storage_service():
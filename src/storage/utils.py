@@ -0,0 +1,121 @@
+import base64
+import hashlib
+import re
+from typing import Optional
+
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    """The requested byte range lies outside the file (HTTP 416)."""
+
+    def __init__(self, size: int):
+        super().__init__(f"Range not satisfiable for {size} bytes")
+        self.size = size
+
+
+class FileChangedError(Exception):
+    """The file was replaced while it was being read against a known ETag."""
+
+
+class InvalidContinuationToken(ValueError):
+    """A listing continuation token that cannot be used (malformed or expired)."""
+
+
+class UploadNotFound(LookupError):
+    """Unknown or expired resumable upload session."""
+
+
+class UploadInProgress(Exception):
+    """Another upload to the same file name is in progress."""
+
+
+class ChecksumMismatch(ValueError):
+    """A block's content does not match the MD5 sent by the client."""
+
+
+class MissingBlocks(Exception):
+    """Blocks are missing when committing a resumable upload."""
+
+    def __init__(self, missing: list[int]):
+        super().__init__(f"Missing blocks: {missing}")
+        self.missing = missing
+
+
+def encode_name_token(name: str, prefix: str = "") -> str:
+    """Continuation token resuming a listing after the given file name."""
+    return prefix + base64.urlsafe_b64encode(name.encode()).decode()
+
+
+def decode_name_token(token: str, prefix: str = "") -> str:
+    try:
+        if not token.startswith(prefix):
+            raise ValueError(token)
+        return base64.b64decode(token[len(prefix) :].encode(), altchars=b"-_", validate=True).decode()
+    except ValueError:
+        raise InvalidContinuationToken(f"Invalid continuation token '{token}'")
+
+
+def make_block_id(upload_id: str, index: int) -> str:
+    """Block ids must have the same length within a blob; upload_id is a fixed-length hex uuid."""
+    return base64.b64encode(f"{upload_id}:{index:06d}".encode()).decode()
+
+
+def parse_block_id(block_id: str) -> tuple[str, int]:
+    """Reverse make_block_id; raises ValueError for blocks staged by other clients."""
+    upload_id, index = base64.b64decode(block_id, validate=True).decode().split(":")
+    return upload_id, int(index)
+
+
+def verify_md5(data: bytes, content_md5: Optional[str]) -> str:
+    """Return the base64 MD5 of data; raise ChecksumMismatch if it differs from content_md5."""
+    digest = base64.b64encode(hashlib.md5(data).digest()).decode()
+    if content_md5 and content_md5.strip() != digest:
+        raise ChecksumMismatch(f"Content-MD5 mismatch: expected {content_md5}, got {digest}")
+    return digest
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single-range `Range` header into inclusive (start, end) offsets.
+
+    Returns None when the whole file should be sent: no header, a malformed
+    header or a multi-range request (all of which RFC 9110 allows to ignore).
+    Raises RangeNotSatisfiable if the range starts past the end of the file.
+    """
+    if not header:
+        return None
+
+    match = _BYTE_RANGE.match(header.strip().replace(" ", ""))
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(size)
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(size)
+    return start, min(end, size - 1)
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """True if an `If-None-Match` header matches the ETag (weak comparison)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def strip_weak(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return strip_weak(etag) in {strip_weak(tag) for tag in if_none_match.split(",")}
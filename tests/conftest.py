@@ -3,9 +3,15 @@ import os
 import fakeredis.aioredis
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
 
 os.environ["TESTING"] = "1"
 
+from src.cache.service import local_cache  # noqa
+from src.database.base import Base  # noqa
 from src.main import app  # noqa
 
 
@@ -19,5 +25,30 @@ def fake_redis(monkeypatch):
     redis = fakeredis.aioredis.FakeRedis()
 
     monkeypatch.setattr("src.cache.service.get_redis", lambda: redis)
+    local_cache.clear()
 
     return redis
+
+
+@compiles(TSVECTOR, "sqlite")
+def _compile_tsvector_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+
+@pytest.fixture
+async def db_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    # SQLite stand-in for the PostgreSQL function behind the generated search_vector column
+    @event.listens_for(engine.sync_engine, "connect")
+    def _register_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("to_tsvector", 2, lambda config, text: text.lower(), deterministic=True)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+
+    await engine.dispose()
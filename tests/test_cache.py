@@ -1,8 +1,26 @@
 import asyncio
+import json
 
 import pytest
 
-from src.cache.service import cache_get, cache_set
+from src.cache.codec import FORMAT_VERSION, MAGIC, CacheSerializer, JsonCodec, NoCompression, ZlibCompression
+from src.cache.service import (
+    _apply_invalidation,
+    cache_delete,
+    cache_get,
+    cache_get_or_fetch,
+    cache_incr,
+    cache_lock_acquire,
+    cache_lock_extend,
+    cache_lock_release,
+    cache_mget,
+    cache_mset,
+    cache_set,
+    cache_set_swr,
+    get_cache_stats,
+    local_cache,
+)
+from src.core.redis_client import get_redis
 
 
 @pytest.mark.asyncio
@@ -48,3 +66,202 @@ async def test_cache_ttl_expiration(fake_redis):
     result = await cache_get(key)
 
     assert result is None
+
+
+def test_get_redis_returns_shared_client(monkeypatch):
+    monkeypatch.setattr("src.core.redis_client.settings.redis_url", "redis://localhost:6379/0")
+    monkeypatch.setattr("src.core.redis_client._redis", None)
+
+    assert get_redis() is get_redis()
+
+
+@pytest.mark.asyncio
+async def test_cache_get_or_fetch_coalesces_concurrent_misses(fake_redis):
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"x": 1}
+
+    results = await asyncio.gather(*(cache_get_or_fetch("test:coalesce", fetch, ttl=5) for _ in range(10)))
+
+    assert calls == 1
+    assert all(r == {"x": 1} for r in results)
+    assert await cache_get("test:coalesce") == {"x": 1}
+
+
+@pytest.mark.asyncio
+async def test_cache_get_or_fetch_serves_stale_while_locked(fake_redis, monkeypatch):
+    monkeypatch.setattr("src.cache.service.settings.cache_lock_wait", 0.1)
+
+    async def fetch():
+        raise AssertionError("upstream must not be called while another worker refreshes")
+
+    await cache_set("test:stale:fallback", {"x": "stale"})
+    token = await cache_lock_acquire("test:stale")
+
+    result = await cache_get_or_fetch("test:stale", fetch, ttl=5, stale_key="test:stale:fallback")
+
+    assert token is not None
+    assert result == {"x": "stale"}
+
+
+@pytest.mark.asyncio
+async def test_cache_lock_release_requires_owner(fake_redis):
+    token = await cache_lock_acquire("test:lock")
+
+    await cache_lock_release("test:lock", "someone-else")
+    assert await cache_lock_acquire("test:lock") is None
+    assert not await cache_lock_extend("test:lock", "someone-else")
+    assert await cache_lock_extend("test:lock", token)
+
+    await cache_lock_release("test:lock", token)
+    assert await cache_lock_acquire("test:lock") is not None
+
+
+@pytest.mark.asyncio
+async def test_cache_get_or_fetch_returns_stale_and_revalidates(fake_redis):
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return {"version": calls}
+
+    await cache_set_swr("test:swr", {"version": 0}, soft_ttl=-1, ttl=60)
+
+    result = await cache_get_or_fetch("test:swr", fetch, ttl=60, soft_ttl=30)
+    assert result == {"version": 0}
+
+    await asyncio.sleep(0.05)
+
+    assert calls == 1
+    assert await cache_get_or_fetch("test:swr", fetch, ttl=60, soft_ttl=30) == {"version": 1}
+
+
+@pytest.mark.asyncio
+async def test_cache_miss_during_revalidation_gets_value(fake_redis):
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return {"version": 1}
+
+    await cache_set_swr("test:swr", {"version": 0}, soft_ttl=-1, ttl=60)
+    assert await cache_get_or_fetch("test:swr", fetch, ttl=60, soft_ttl=30) == {"version": 0}
+
+    # the entry disappears (hard expiry, eviction) while the background refresh runs
+    await cache_delete(["test:swr"])
+    miss = asyncio.create_task(cache_get_or_fetch("test:swr", fetch, ttl=60, soft_ttl=30))
+    await asyncio.sleep(0.05)
+    release.set()
+
+    assert await miss == {"version": 1}
+
+
+@pytest.mark.asyncio
+async def test_cache_get_served_from_l1(fake_redis):
+    await cache_set("test:l1", {"x": 1}, ttl=5)
+    before = get_cache_stats()["l1"]["hits"]
+
+    # L1 keeps serving the entry without a Redis round trip
+    await fake_redis.delete("test:l1")
+    result = await cache_get("test:l1")
+
+    assert result == {"x": 1}
+    assert get_cache_stats()["l1"]["hits"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidation_from_other_worker_evicts_l1(fake_redis):
+    await cache_set("test:l1:evict", {"x": 1}, ttl=5)
+    await fake_redis.set("test:l1:evict", json.dumps({"x": 2}))
+
+    _apply_invalidation(json.dumps({"origin": "other-worker", "keys": ["test:l1:evict"]}))
+
+    assert await cache_get("test:l1:evict") == {"x": 2}
+
+
+def test_cache_stats_route(client):
+    response = client.get("/cache/stats")
+    assert response.status_code == 200
+    assert set(response.json()) == {"l1", "l2"}
+
+
+@pytest.mark.asyncio
+async def test_cache_mset_and_mget_partial(fake_redis):
+    await cache_mset([("test:m:1", {"x": 1}, 5), ("test:m:2", "two", None)])
+    local_cache.clear()
+
+    result = await cache_mget(["test:m:1", "test:m:2", "test:m:missing"])
+
+    assert result == {"test:m:1": {"x": 1}, "test:m:2": "two"}
+    assert await fake_redis.ttl("test:m:2") == -1
+
+
+@pytest.mark.asyncio
+async def test_cache_delete_and_incr(fake_redis):
+    await cache_set("test:del", "value")
+    assert await cache_incr("test:version") == 1
+    assert await cache_get("test:version") == 1
+
+    await cache_delete(["test:del"])
+    assert await cache_incr("test:version") == 2
+
+    assert await cache_get("test:del") is None
+    assert await cache_get("test:version") == 2
+
+
+def test_cache_mset_mget_routes(client, fake_redis):
+    response = client.post(
+        "/cache/mset",
+        json={"items": [{"key": "route:m:1", "value": "a", "ttl": 5}, {"key": "route:m:2", "value": "b"}]},
+    )
+    assert response.status_code == 200
+
+    response = client.post("/cache/mget", json={"keys": ["route:m:1", "route:m:2", "route:m:3"]})
+    assert response.status_code == 200
+    assert response.json() == {"values": {"route:m:1": "a", "route:m:2": "b"}, "missing": ["route:m:3"]}
+
+
+def test_cache_get_route_missing_key(client, fake_redis):
+    response = client.get("/cache/get/route:missing")
+    assert response.status_code == 404
+
+
+def test_serializer_compresses_large_values():
+    serializer = CacheSerializer(codec="json", compression="zlib", threshold=64)
+    value = {"text": "cat " * 100}
+
+    small = serializer.dumps({"x": 1})
+    large = serializer.dumps(value)
+
+    assert small[:4] == MAGIC + bytes((FORMAT_VERSION, JsonCodec.id, NoCompression.id))
+    assert large[:4] == MAGIC + bytes((FORMAT_VERSION, JsonCodec.id, ZlibCompression.id))
+    assert len(large) < len(json.dumps(value))
+    assert serializer.loads(large) == value
+
+
+def test_serializer_reads_legacy_json_entries():
+    serializer = CacheSerializer(codec="orjson", compression="zlib", threshold=64)
+
+    assert serializer.loads(json.dumps({"x": 1})) == {"x": 1}
+    assert serializer.loads(json.dumps({"x": 1}).encode()) == {"x": 1}
+
+
+def test_serializer_unknown_codec_falls_back_to_json():
+    serializer = CacheSerializer(codec="does-not-exist", compression="none", threshold=64)
+
+    assert serializer.codec.name == "json"
+    assert serializer.loads(serializer.dumps([1, 2])) == [1, 2]
+
+
+def test_serializer_legacy_mode_writes_bare_json_without_warning(caplog):
+    with caplog.at_level("WARNING", logger="src.cache.codec"):
+        serializer = CacheSerializer(codec="legacy", compression="zlib", threshold=64)
+
+    assert caplog.records == []
+    assert serializer.dumps({"x": 1}) == b'{"x": 1}'
+    assert serializer.loads(serializer.dumps({"x": 1})) == {"x": 1}
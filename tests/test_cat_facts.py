@@ -0,0 +1,322 @@
+from datetime import datetime, timedelta
+from unittest.mock import ANY, AsyncMock, patch
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.cat_facts.config import cat_fact_config
+from src.cat_facts.fact_cache import fact_cache
+from src.cat_facts.leaderboard import leaderboard
+from src.cat_facts.models import CatFactCreate, CatFactOut, CatFactUpdate
+from src.cat_facts.repository import CatFactRepository, CatFactStatsRepository
+from src.cat_facts.service import CatFactService
+from src.cat_facts.stats_buffer import stats_buffer
+from src.cat_facts.utils import build_prefix_tsquery, decode_search_cursor, encode_search_cursor
+from src.database.base import Base
+from src.database.routing import ReplicaSet, RoutingSession
+
+
+@pytest.fixture
+async def fact_repo(db_session):
+    return CatFactRepository(db_session)
+
+
+@pytest.mark.asyncio
+async def test_get_random_empty_table(fact_repo):
+    assert await fact_repo.get_random() is None
+
+
+@pytest.mark.asyncio
+async def test_get_random_skips_deleted_ids(fact_repo):
+    facts = [await fact_repo.create({"text": f"Cat fact number {i}"}) for i in range(20)]
+    for fact in facts[1:-1]:
+        await fact_repo.delete(fact.id)
+
+    picked = {(await fact_repo.get_random()).id for _ in range(50)}
+
+    assert picked == {facts[0].id, facts[-1].id}
+
+
+@pytest.fixture
+def buffer_redis(fake_redis, monkeypatch):
+    monkeypatch.setattr("src.cat_facts.stats_buffer.get_redis", lambda: fake_redis)
+    monkeypatch.setattr("src.cat_facts.leaderboard.get_redis", lambda: fake_redis)
+    return fake_redis
+
+
+@pytest.mark.asyncio
+async def test_stats_buffer_accumulates_pending_counts(buffer_redis):
+    await stats_buffer.record(1)
+    await stats_buffer.record(1)
+    await stats_buffer.record(2)
+
+    count, last = await stats_buffer.pending(1)
+
+    assert count == 2
+    assert last is not None
+    assert (await stats_buffer.pending(3))[0] == 0
+
+
+@pytest.mark.asyncio
+async def test_stats_buffer_flush_persists_and_clears(buffer_redis):
+    await stats_buffer.record(1)
+    await stats_buffer.record(1)
+
+    with patch(
+        "src.cat_facts.stats_buffer.CatFactStatsRepository.apply_increments", new_callable=AsyncMock
+    ) as apply_increments:
+        assert await stats_buffer.flush() == 1
+
+    increments = apply_increments.await_args.args[0]
+    assert increments[1][0] == 2
+    assert (await stats_buffer.pending(1))[0] == 0
+
+
+@pytest.mark.asyncio
+async def test_apply_increments_upserts_and_skips_deleted_facts(db_session, fact_repo):
+    stats_repo = CatFactStatsRepository(db_session)
+    counted, fresh, deleted = [await fact_repo.create({"text": f"Cat fact number {i}"}) for i in range(3)]
+    await fact_repo.delete(deleted.id)
+    earlier = datetime(2026, 1, 1)
+    await stats_repo.apply_increments({counted.id: (3, earlier + timedelta(hours=1))})
+
+    await stats_repo.apply_increments(
+        {counted.id: (2, earlier), fresh.id: (1, None), deleted.id: (5, earlier)},
+    )
+
+    counted_stats = await stats_repo.get_by_fact_id(counted.id)
+    assert (counted_stats.request_count, counted_stats.last_requested_at) == (5, earlier + timedelta(hours=1))
+    assert (await stats_repo.get_by_fact_id(fresh.id)).request_count == 1
+    assert await stats_repo.get_by_fact_id(deleted.id) is None
+
+
+@pytest.mark.asyncio
+async def test_apply_increments_counts_a_flush_batch_once(db_session, fact_repo):
+    stats_repo = CatFactStatsRepository(db_session)
+    fact_id = (await fact_repo.create({"text": "Cat fact with stats"})).id
+
+    assert await stats_repo.apply_increments({fact_id: (3, None)}, flush_id="batch-1")
+    assert not await stats_repo.apply_increments({fact_id: (3, None)}, flush_id="batch-1")
+    assert await stats_repo.apply_increments({fact_id: (1, None)}, flush_id="batch-2")
+
+    assert (await stats_repo.get_by_fact_id(fact_id)).request_count == 4
+
+
+@pytest.mark.asyncio
+async def test_apply_increments_ignores_lagging_replica(db_session, fact_repo):
+    fact = await fact_repo.create({"text": "Cat fact not replicated yet"})
+    replica = create_async_engine("sqlite+aiosqlite://")
+
+    @event.listens_for(replica.sync_engine, "connect")
+    def _register_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("to_tsvector", 2, lambda config, text: text, deterministic=True)
+
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    class LaggingReplicaSession(RoutingSession):
+        replicas = ReplicaSet([replica.sync_engine])
+
+    async with AsyncSession(bind=db_session.bind, sync_session_class=LaggingReplicaSession) as session:
+        await CatFactStatsRepository(session).apply_increments({fact.id: (2, None)})
+    await replica.dispose()
+
+    assert (await CatFactStatsRepository(db_session).get_by_fact_id(fact.id)).request_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stats_buffer_failed_flush_is_recovered_once(buffer_redis):
+    await stats_buffer.record(1)
+
+    with patch(
+        "src.cat_facts.stats_buffer.CatFactStatsRepository.apply_increments",
+        new_callable=AsyncMock,
+        side_effect=RuntimeError("db down"),
+    ) as failed_apply:
+        with pytest.raises(RuntimeError):
+            await stats_buffer.flush()
+    _, flush_id = failed_apply.await_args.args
+
+    # the failed batch is handed to the next recovery run under the same flush id
+    with patch(
+        "src.cat_facts.stats_buffer.CatFactStatsRepository.apply_increments", new_callable=AsyncMock
+    ) as apply_increments:
+        assert await stats_buffer.recover_orphans() == 1
+
+    increments, recovered_id = apply_increments.await_args.args
+    assert (increments[1][0], recovered_id) == (1, flush_id)
+    assert await buffer_redis.keys(f"{stats_buffer.pending_key}:flushing:*") == []
+
+
+@pytest.mark.asyncio
+async def test_stats_buffer_recovers_batch_after_failed_read(buffer_redis):
+    await stats_buffer.record(1)
+    await stats_buffer.record(1)
+
+    with patch.object(buffer_redis, "hgetall", side_effect=TimeoutError("read timeout")):
+        with pytest.raises(TimeoutError):
+            await stats_buffer.flush()
+    assert (await stats_buffer.pending(1))[0] == 0
+
+    # a batch another worker is flushing right now must be left alone
+    await buffer_redis.hset(stats_buffer._flushing_key("in-flight"), "count:2", 1)
+
+    with patch(
+        "src.cat_facts.stats_buffer.CatFactStatsRepository.apply_increments", new_callable=AsyncMock
+    ) as apply_increments:
+        assert await stats_buffer.recover_orphans() == 1
+
+    assert apply_increments.await_args.args[0] == {1: (2, ANY)}
+    assert len(await buffer_redis.keys(f"{stats_buffer.pending_key}:flushing:*")) == 1
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_follows_recorded_requests(buffer_redis):
+    for fact_id in (1, 2, 2, 3, 3, 3):
+        await stats_buffer.record(fact_id)
+
+    assert await leaderboard.top(2) == [(3, 3), (2, 2)]
+
+    await leaderboard.remove(3)
+    assert await leaderboard.top(2) == [(2, 2), (1, 1)]
+
+
+@pytest.mark.asyncio
+async def test_get_top_facts_falls_back_to_database(db_session, buffer_redis):
+    service = CatFactService(db_session)
+    first = await service.create_fact(CatFactCreate(text="Cats spend 70% of their lives asleep"))
+    second = await service.create_fact(CatFactCreate(text="A group of cats is called a clowder"))
+    stats = await service.stats_repo.get_by_fact_id(second.id)
+    stats.request_count = 4
+    await db_session.commit()
+    await buffer_redis.hincrby(stats_buffer.pending_key, f"count:{first.id}", 5)
+
+    top = await service.get_top_facts(2)
+
+    assert [(entry.fact_id, entry.request_count) for entry in top] == [(first.id, 5), (second.id, 4)]
+
+
+@pytest.mark.asyncio
+async def test_random_fact_served_from_cache(db_session, fake_redis, buffer_redis):
+    service = CatFactService(db_session)
+    fact = await service.create_fact(CatFactCreate(text="Cats spend 70% of their lives asleep"))
+    assert (await service.get_local_random_fact()).id == fact.id
+
+    with (
+        patch.object(service.fact_repo, "get_id_bounds", side_effect=AssertionError("db hit")),
+        patch.object(service.fact_repo, "get_many", side_effect=AssertionError("db hit")),
+    ):
+        assert (await service.get_local_random_fact()).id == fact.id
+
+
+@pytest.mark.asyncio
+async def test_fact_cache_forgets_missing_ids_once_created(db_session, fake_redis):
+    service = CatFactService(db_session)
+    await fact_cache.set_items([], missing_ids=[1])
+    assert await fact_cache.get_items([1]) == {1: None}
+    assert await fake_redis.ttl(fact_cache.item_key.format(fact_id=1)) <= cat_fact_config.cache_bounds_TTL
+
+    fact = await service.create_fact(CatFactCreate(text="Cats spend 70% of their lives asleep"))
+
+    assert fact.id == 1
+    assert (await service._get_facts([1]))[1].text == fact.text
+
+
+@pytest.mark.asyncio
+async def test_fact_cache_invalidated_on_update_and_delete(db_session, fake_redis):
+    service = CatFactService(db_session)
+    fact = await service.create_fact(CatFactCreate(text="Cats spend 70% of their lives asleep"))
+    assert (await service.list_facts(10)).items[0].text == fact.text
+
+    await service.update_fact(fact.id, CatFactUpdate(text="Cats sleep for most of the day"))
+    assert (await service.list_facts(10)).items[0].text == "Cats sleep for most of the day"
+
+    await service.delete_fact(fact.id)
+    assert (await service.list_facts(10)).items == []
+
+
+@pytest.mark.asyncio
+async def test_list_facts_keyset_pages(db_session):
+    service = CatFactService(db_session)
+    for i in range(5):
+        await service.fact_repo.create({"text": f"Cat fact number {i}"})
+
+    first = await service.list_facts(limit=2)
+    second = await service.list_facts(limit=2, after=first.next_after)
+    last = await service.list_facts(limit=2, after=second.next_after)
+
+    assert [f.id for f in first.items + second.items + last.items] == [1, 2, 3, 4, 5]
+    assert last.next_after is None
+
+
+@pytest.mark.asyncio
+async def test_stream_rows_yields_all_rows_in_order(fact_repo):
+    for i in range(3):
+        await fact_repo.create({"text": f"Cat fact number {i}"})
+
+    rows = [row async for row in fact_repo.stream_rows(batch_size=2)]
+
+    assert [CatFactOut.model_validate(row).id for row in rows] == [1, 2, 3]
+
+
+async def as_async_iter(items):
+    for item in items:
+        yield item
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_facts_reports_invalid_items(db_session, monkeypatch):
+    monkeypatch.setattr("src.cat_facts.service.cfg.bulk_chunk_size", 2)
+    service = CatFactService(db_session)
+    items = [
+        {"text": "Cats have five toes on their front paws"},
+        {"text": "x"},
+        b'{"text": "Cats can rotate their ears 180 degrees"}',
+        b"{not json",
+        {"text": "A group of cats is called a clowder", "image_url": "https://example.com/cat.jpg"},
+    ]
+
+    result = await service.bulk_create_facts(as_async_iter(items))
+
+    assert result.created == 3
+    assert [error.index for error in result.errors] == [1, 3]
+    assert len(await service.fact_repo.get_all()) == 3
+    assert await service.stats_repo.get_by_fact_id(result.ids[-1]) is not None
+
+
+@pytest.mark.asyncio
+async def test_create_fact_is_atomic(db_session):
+    service = CatFactService(db_session)
+
+    with patch.object(service.stats_repo, "create_initial", side_effect=RuntimeError("stats failed")):
+        with pytest.raises(RuntimeError):
+            await service.create_fact(CatFactCreate(text="Cats spend 70% of their lives asleep"))
+
+    assert await service.fact_repo.get_all() == []
+
+
+@pytest.mark.asyncio
+async def test_delete_fact_removes_stats(db_session):
+    service = CatFactService(db_session)
+    fact = await service.create_fact(CatFactCreate(text="Cats spend 70% of their lives asleep"))
+
+    assert await service.delete_fact(fact.id) is True
+    assert await service.delete_fact(fact.id) is False
+    assert await service.stats_repo.get_by_fact_id(fact.id) is None
+
+
+def test_build_prefix_tsquery():
+    assert build_prefix_tsquery("Cat  SLEE!") == "cat:* & slee:*"
+    assert build_prefix_tsquery("&|!") is None
+
+
+def test_search_cursor_roundtrip():
+    assert decode_search_cursor(encode_search_cursor(0.0607927, 42)) == (0.0607927, 42)
+
+
+def test_update_rejects_null_text():
+    assert CatFactUpdate.model_validate({"image_url": None}).model_dump(exclude_unset=True) == {"image_url": None}
+    with pytest.raises(ValidationError):
+        CatFactUpdate.model_validate({"text": None})
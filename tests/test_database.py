@@ -0,0 +1,157 @@
+import pytest
+from sqlalchemy import create_engine, delete, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.cat_facts.repository import CatFactRepository, CatFactStatsRepository
+from src.cat_facts.schema import CatFact
+from src.database.instrumentation import fingerprint, instrument_engine, normalize_statement, query_stats
+from src.database.routing import ReplicaSet, RoutingSession
+from src.database.unit_of_work import UnitOfWork, in_unit_of_work
+
+
+def test_normalize_statement_groups_equivalent_queries():
+    first = normalize_statement("SELECT * FROM cat_facts WHERE id IN ($1::INTEGER, $2::INTEGER)")
+    second = normalize_statement("SELECT *   FROM cat_facts\nWHERE id IN ($1::INTEGER)")
+
+    assert first == second == "SELECT * FROM cat_facts WHERE id IN (...)"
+    assert fingerprint("SELECT 1")[0] == fingerprint("SELECT 2")[0]
+
+
+@pytest.mark.asyncio
+async def test_instrumented_engine_records_query_stats(monkeypatch):
+    monkeypatch.setattr("src.database.instrumentation.settings.db_slow_query_ms", 0)
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine.sync_engine)
+    query_stats.reset()
+
+    async with engine.connect() as conn:
+        for value in (1, 2, 3):
+            await conn.execute(text("SELECT :value"), {"value": value})
+    await engine.dispose()
+
+    stats = [item for item in query_stats.snapshot() if item["statement"] == "SELECT ?"]
+    assert len(stats) == 1
+    assert stats[0]["calls"] == 3
+    assert stats[0]["max_ms"] >= stats[0]["avg_ms"]
+
+
+@pytest.fixture
+async def fact_repo(db_session):
+    return CatFactRepository(db_session)
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_get_many_and_delete(fact_repo):
+    facts = await fact_repo.bulk_create([{"text": f"Cat fact number {i}"} for i in range(5)])
+
+    assert [f.text for f in facts] == [f"Cat fact number {i}" for i in range(5)]
+    assert {f.id for f in await fact_repo.get_many([facts[0].id, facts[1].id, 999])} == {facts[0].id, facts[1].id}
+
+    assert await fact_repo.bulk_delete([facts[0].id, facts[1].id]) == 2
+    assert len(await fact_repo.get_all()) == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_by_id(fact_repo):
+    facts = await fact_repo.bulk_create([{"text": "Original cat fact"}, {"text": "Another cat fact"}])
+
+    assert await fact_repo.bulk_update({facts[0].id: {"text": "Updated cat fact"}, 999: {"text": "Missing fact"}}) == 1
+
+    fact = await fact_repo.get_by_id(facts[0].id)
+    await fact_repo.session.refresh(fact)
+    assert fact.text == "Updated cat fact"
+
+
+@pytest.mark.asyncio
+async def test_upsert_updates_on_conflict(db_session, fact_repo):
+    stats_repo = CatFactStatsRepository(db_session)
+    fact = await fact_repo.create({"text": "Cat fact with stats"})
+    await stats_repo.create_initial(fact.id)
+
+    result = await stats_repo.upsert([{"fact_id": fact.id, "request_count": 7}], conflict_columns=["fact_id"])
+
+    assert len(result) == 1
+    assert (await stats_repo.get_by_fact_id(fact.id)).request_count == 7
+
+
+@pytest.mark.asyncio
+async def test_upsert_only_conflict_columns_skips_existing(db_session, fact_repo):
+    stats_repo = CatFactStatsRepository(db_session)
+    existing, new = [await fact_repo.create({"text": f"Cat fact number {i}"}) for i in range(2)]
+    await stats_repo.create_initial(existing.id)
+
+    result = await stats_repo.upsert([{"fact_id": existing.id}, {"fact_id": new.id}], conflict_columns=["fact_id"])
+
+    assert [stats.fact_id for stats in result] == [new.id]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_deferred_commit_rolls_back(fact_repo):
+    await fact_repo.bulk_create([{"text": "Uncommitted cat fact"}], commit=False)
+    await fact_repo.session.rollback()
+
+    assert await fact_repo.get_all() == []
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_commits_once_at_the_end(db_session, fact_repo):
+    async with UnitOfWork(db_session):
+        await fact_repo.create({"text": "First cat fact"})
+        async with UnitOfWork(db_session):
+            await fact_repo.create({"text": "Second cat fact"})
+        assert db_session.in_transaction()
+
+    assert not in_unit_of_work(db_session)
+    assert len(await fact_repo.get_all()) == 2
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rolls_back_on_error(db_session, fact_repo):
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork(db_session):
+            await fact_repo.create({"text": "Rolled back cat fact"})
+            raise RuntimeError("boom")
+
+    assert await fact_repo.get_all() == []
+
+
+@pytest.fixture
+def routed_session():
+    primary = create_engine("sqlite://")
+    replicas = ReplicaSet([create_engine("sqlite://"), create_engine("sqlite://")])
+
+    class Session(RoutingSession):
+        pass
+
+    Session.replicas = replicas
+    return Session(bind=primary), primary, replicas
+
+
+def test_routing_session_balances_reads_and_pins_after_write(routed_session):
+    session, primary, replicas = routed_session
+
+    reads = {session.get_bind(clause=select(CatFact)) for _ in range(4)}
+    assert reads == set(replicas.engines)
+    assert session.get_bind(clause=select(CatFact).with_for_update()) is primary
+
+    assert session.get_bind(clause=delete(CatFact)) is primary
+    assert session.get_bind(clause=select(CatFact)) is primary
+
+
+def test_routing_session_fails_over_to_healthy_replica(routed_session):
+    session, primary, replicas = routed_session
+    first, second = replicas.engines
+
+    replicas.mark_down(first)
+    assert {session.get_bind(clause=select(CatFact)) for _ in range(4)} == {second}
+
+    replicas.mark_down(second)
+    assert session.get_bind(clause=select(CatFact)) is primary
+
+
+def test_upsert_dialect_lookup_does_not_pin_to_primary(routed_session):
+    session, primary, replicas = routed_session
+
+    CatFactRepository(session)._upsert_insert()
+
+    assert session.get_bind(clause=select(CatFact)) in replicas.engines
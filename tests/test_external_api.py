@@ -1,7 +1,11 @@
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
+import httpx
 import pytest
-import requests
+
+from src.cache.service import cache_set
+from src.external_api.service import CatService
 
 FACT_TEXT = "Cats sleep for 12–16 hours every day. Long fact to satisfy model length limits."
 
@@ -17,15 +21,17 @@ def make_mock_response(json_data: dict, status_code: int = 200) -> Mock:
 
 
 @pytest.fixture
-def mock_requests_get():
-    with patch("src.external_api.service.requests.get") as mock:
-        yield mock
+def mock_http_get():
+    http_client = Mock()
+    http_client.get = AsyncMock()
+    with patch("src.external_api.service.get_http_client", return_value=http_client):
+        yield http_client.get
 
 
-def test_cat_fact(client, mock_requests_get):
+def test_cat_fact(client, mock_http_get):
     fact = FACT_TEXT
 
-    mock_requests_get.return_value = make_mock_response({"fact": fact, "length": len(fact)})
+    mock_http_get.return_value = make_mock_response({"fact": fact, "length": len(fact)})
 
     response = client.get("/external/fact")
     assert response.status_code == 200
@@ -35,8 +41,8 @@ def test_cat_fact(client, mock_requests_get):
     assert data["length"] == len(fact)
 
 
-def test_cat_image(client, mock_requests_get):
-    mock_requests_get.return_value = make_mock_response([{"url": IMAGE_URL}])
+def test_cat_image(client, mock_http_get):
+    mock_http_get.return_value = make_mock_response([{"url": IMAGE_URL}])
 
     response = client.get("/external/image")
     assert response.status_code == 200
@@ -45,13 +51,40 @@ def test_cat_image(client, mock_requests_get):
     assert data["url"] == IMAGE_URL
 
 
-def test_cat_combined(client, mock_requests_get):
+def route_by_url(fact_response, image_response):
+    def handler(url, *args, **kwargs):
+        response = fact_response if url == CatService.fact_url else image_response
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return handler
+
+
+def test_cat_combined(client, mock_http_get):
     fact = FACT_TEXT
 
-    mock_requests_get.side_effect = [
+    mock_http_get.side_effect = route_by_url(
         make_mock_response({"fact": fact, "length": len(fact)}),
         make_mock_response([{"url": IMAGE_URL}]),
-    ]
+    )
+
+    response = client.get("/external/cat")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["fact"] == fact
+    assert data["image_url"] == IMAGE_URL
+
+
+def test_cat_combined_serves_fallback_on_partial_failure(client, mock_http_get, fake_redis):
+    fact = FACT_TEXT
+    asyncio.run(cache_set(CatService.fact_fallback_key, {"fact": fact, "length": len(fact)}))
+
+    mock_http_get.side_effect = route_by_url(
+        httpx.ReadTimeout("timeout"),
+        make_mock_response([{"url": IMAGE_URL}]),
+    )
 
     response = client.get("/external/cat")
     assert response.status_code == 200
@@ -61,6 +94,16 @@ def test_cat_combined(client, mock_requests_get):
     assert data["image_url"] == IMAGE_URL
 
 
+def test_cat_combined_fails_without_fallback(client, mock_http_get, fake_redis):
+    mock_http_get.side_effect = route_by_url(
+        httpx.ReadTimeout("timeout"),
+        make_mock_response([{"url": IMAGE_URL}]),
+    )
+
+    response = client.get("/external/cat")
+    assert response.status_code == 500
+
+
 def mock_failed_request(*args, **kwargs):
     raise Exception("API failed")
 
@@ -86,7 +129,7 @@ def test_cat_combined_error(mock_method, client):
     assert response.json()["detail"] == "Failed to retrieve cat info"
 
 
-@patch("src.external_api.service.CatService.get_cat_fact", side_effect=requests.Timeout)
+@patch("src.external_api.service.CatService.get_cat_fact", side_effect=httpx.ReadTimeout("timeout"))
 def test_cat_fact_timeout(mock_method, client):
     response = client.get("/external/fact")
     assert response.status_code == 500
@@ -0,0 +1,458 @@
+import asyncio
+import base64
+import hashlib
+from datetime import datetime, timezone
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobBlock, BlobProperties, ContentSettings
+
+from src.cache.service import cache_lock_acquire, cache_lock_release
+from src.settings import settings
+from src.storage.backends import AzureBlobBackend, FileInfo, LocalDiskBackend
+from src.storage.config import azure_config
+from src.storage.listing import listing_index
+from src.storage.responses import ZEROCOPY_SEND, FileStreamResponse
+from src.storage.utils import RangeNotSatisfiable, etag_matches, parse_range
+
+
+class FakeDownload:
+    def __init__(self, data: bytes, chunk_size: int = 4):
+        self.data = data
+        self.chunk_size = chunk_size
+
+    async def chunks(self):
+        for start in range(0, len(self.data), self.chunk_size):
+            yield self.data[start : start + self.chunk_size]
+
+
+class FakeBlobClient:
+    def __init__(self, container: "FakeContainerClient", name: str):
+        self.blobs = container.blobs
+        self.staged = container.staged.setdefault(name, {})
+        self.name = name
+
+    async def upload_blob(self, data, overwrite=False, **kwargs):
+        self.blobs[self.name] = data
+
+    async def stage_block(self, block_id, data, validate_content=False, **kwargs):
+        assert validate_content
+        self.staged[block_id] = data
+
+    async def get_block_list(self, block_list_type="committed", **kwargs):
+        if self.name not in self.blobs and not self.staged:
+            raise ResourceNotFoundError("not found")
+        return [], [BlobBlock(block_id) for block_id in self.staged]
+
+    async def commit_block_list(self, block_ids, **kwargs):
+        self.blobs[self.name] = b"".join(self.staged.pop(block_id) for block_id in block_ids)
+
+    async def get_blob_properties(self, **kwargs):
+        if self.name not in self.blobs:
+            raise ResourceNotFoundError("not found")
+        return _properties(self.name, self.blobs[self.name])
+
+    async def download_blob(self, offset=0, length=None, **kwargs):
+        if self.name not in self.blobs:
+            raise ResourceNotFoundError("not found")
+        data = self.blobs[self.name]
+        end = len(data) if length is None else offset + length
+        return FakeDownload(data[offset:end])
+
+    async def delete_blob(self, **kwargs):
+        if self.blobs.pop(self.name, None) is None:
+            raise ResourceNotFoundError("not found")
+
+
+class FakePages:
+    """Mimics AsyncItemPaged.by_page(): pages of BlobProperties with a numeric marker."""
+
+    def __init__(self, blobs: list[BlobProperties], per_page: int, token):
+        self.blobs = blobs
+        self.per_page = per_page
+        self.continuation_token = token
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        start = int(self.continuation_token or 0)
+        if start >= len(self.blobs) and start:
+            raise StopAsyncIteration
+        end = start + self.per_page
+        self.continuation_token = str(end) if end < len(self.blobs) else None
+        return _aiter(self.blobs[start:end])
+
+
+class FakeBlobList:
+    def __init__(self, blobs: list[BlobProperties], per_page: int):
+        self.blobs = blobs
+        self.per_page = per_page
+
+    def by_page(self, continuation_token=None):
+        return FakePages(self.blobs, self.per_page, continuation_token)
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+def _properties(name: str, data: bytes) -> BlobProperties:
+    properties = BlobProperties(name=name)
+    properties.size = len(data)
+    properties.etag = f'"{hashlib.md5(data).hexdigest()}"'
+    properties.last_modified = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    properties.content_settings = ContentSettings(content_type=None)
+    return properties
+
+
+class FakeContainerClient:
+    def __init__(self):
+        self.blobs: dict[str, bytes] = {}
+        self.staged: dict[str, dict[str, bytes]] = {}
+
+    def get_blob_client(self, name: str) -> FakeBlobClient:
+        return FakeBlobClient(self, name)
+
+    def list_blobs(self, name_starts_with=None, results_per_page=5000, **kwargs):
+        names = [name for name in sorted(self.blobs) if name.startswith(name_starts_with or "")]
+        return FakeBlobList([_properties(name, self.blobs[name]) for name in names], results_per_page)
+
+
+@pytest.fixture
+def container(monkeypatch):
+    container = FakeContainerClient()
+    monkeypatch.setattr(azure_config, "_container_client", container)
+    return container
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    backend = LocalDiskBackend(tmp_path)
+    monkeypatch.setattr("src.storage.backends._backend", backend)
+    return backend
+
+
+def test_upload_list_download_delete(client, container, fake_redis):
+    response = client.post("/storage/files", files={"file": ("cat.txt", b"meow", "text/plain")})
+    assert response.status_code == 200
+    assert container.blobs == {"cat.txt": b"meow"}
+
+    listing = client.get("/storage/files").json()
+    assert [file["name"] for file in listing["files"]] == ["cat.txt"]
+    assert listing["files"][0]["size"] == 4
+
+    assert client.delete("/storage/files/cat.txt").status_code == 200
+    assert client.delete("/storage/files/cat.txt").status_code == 404
+
+
+def test_upload_stages_blocks_in_parallel(client, container, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "storage_block_size", 4)
+    monkeypatch.setattr(settings, "storage_upload_concurrency", 2)
+
+    response = client.post("/storage/files", files={"file": ("cat.txt", b"0123456789", "text/plain")})
+
+    assert response.status_code == 200
+    assert container.blobs["cat.txt"] == b"0123456789"
+    assert container.staged["cat.txt"] == {}
+
+
+def test_resumable_upload(client, container, fake_redis):
+    upload_id = client.post("/storage/uploads", json={"filename": "big.bin"}).json()["upload_id"]
+
+    # blocks may arrive in any order
+    for index, data in ((1, b"world"), (0, b"hello ")):
+        md5 = base64.b64encode(hashlib.md5(data).digest()).decode()
+        response = client.put(
+            f"/storage/uploads/{upload_id}/blocks/{index}", content=data, headers={"Content-MD5": md5}
+        )
+        assert response.status_code == 200
+
+    bad = client.put(f"/storage/uploads/{upload_id}/blocks/2", content=b"!", headers={"Content-MD5": "AAAA"})
+    assert bad.status_code == 400
+
+    missing = client.post(f"/storage/uploads/{upload_id}/commit", json={"block_count": 3})
+    assert missing.status_code == 409
+    assert missing.json()["detail"]["missing"] == [2]
+
+    assert client.post(f"/storage/uploads/{upload_id}/commit", json={}).status_code == 200
+    assert container.blobs["big.bin"] == b"hello world"
+    assert client.post(f"/storage/uploads/{upload_id}/commit", json={}).status_code == 404
+
+
+def test_resumable_upload_one_open_session_per_file(client, container, fake_redis):
+    upload_id = client.post("/storage/uploads", json={"filename": "big.bin"}).json()["upload_id"]
+    assert client.post("/storage/uploads", json={"filename": "big.bin"}).status_code == 409
+    assert client.post("/storage/uploads", json={"filename": "other.bin"}).status_code == 200
+
+    assert client.delete(f"/storage/uploads/{upload_id}").status_code == 200
+    assert client.put(f"/storage/uploads/{upload_id}/blocks/0", content=b"late").status_code == 404
+
+    upload_id = client.post("/storage/uploads", json={"filename": "big.bin"}).json()["upload_id"]
+    client.put(f"/storage/uploads/{upload_id}/blocks/0", content=b"data")
+    assert client.post(f"/storage/uploads/{upload_id}/commit", json={}).status_code == 200
+    assert client.post("/storage/uploads", json={"filename": "big.bin"}).status_code == 200
+
+
+def test_resumable_upload_blocks_plain_upload_and_lapses_when_idle(client, container, fake_redis):
+    upload_id = client.post("/storage/uploads", json={"filename": "big.bin"}).json()["upload_id"]
+    response = client.post("/storage/files", files={"file": ("big.bin", b"plain", "text/plain")})
+    assert response.status_code == 409
+    assert "big.bin" not in container.blobs
+
+    # the idle session's lock lapses; the name is free again and the session may retake it
+    fake_redis_lock = "lock:storage:uploads:file:big.bin"
+    asyncio.run(fake_redis.delete(fake_redis_lock))
+    assert client.put(f"/storage/uploads/{upload_id}/blocks/0", content=b"data").status_code == 200
+    assert client.post("/storage/uploads", json={"filename": "big.bin"}).status_code == 409
+
+    asyncio.run(fake_redis.delete(fake_redis_lock))
+    other_id = client.post("/storage/uploads", json={"filename": "big.bin"}).json()["upload_id"]
+    assert client.post(f"/storage/uploads/{upload_id}/commit", json={}).status_code == 409
+    assert client.delete(f"/storage/uploads/{other_id}").status_code == 200
+
+
+def test_resumable_upload_commit_without_blocks_and_foreign_blocks(client, container, fake_redis):
+    upload_id = client.post("/storage/uploads", json={"filename": "big.bin"}).json()["upload_id"]
+    missing = client.post(f"/storage/uploads/{upload_id}/commit", json={})
+    assert missing.status_code == 409
+    assert missing.json()["detail"]["missing"] == [0]
+
+    container.staged["big.bin"]["c29tZS1vdGhlci1jbGllbnQ="] = b"foreign"
+    client.put(f"/storage/uploads/{upload_id}/blocks/0", content=b"data")
+    assert client.post(f"/storage/uploads/{upload_id}/commit", json={}).status_code == 200
+    assert container.blobs["big.bin"] == b"data"
+
+
+def _list_all(client, **params) -> list[str]:
+    names, token = [], None
+    while True:
+        page = client.get("/storage/files", params={**params, **({"token": token} if token else {})}).json()
+        names += [file["name"] for file in page["files"]]
+        token = page["next_token"]
+        if not token:
+            return names
+
+
+@pytest.fixture
+def listing_redis(fake_redis, monkeypatch):
+    monkeypatch.setattr("src.storage.listing.get_redis", lambda: fake_redis)
+    return fake_redis
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_list_files_paginates_by_prefix(client, container, listing_redis, monkeypatch, cached):
+    monkeypatch.setattr(settings, "storage_list_cache", cached)
+    for name in ("a/1", "a/2", "a/3", "b/1", "c"):
+        container.blobs[name] = b"x"
+
+    assert _list_all(client, prefix="a/", limit=2) == ["a/1", "a/2", "a/3"]
+    assert _list_all(client, limit=2) == ["a/1", "a/2", "a/3", "b/1", "c"]
+    assert client.get("/storage/files", params={"token": "i.%%%"}).status_code == 400
+
+
+def test_list_files_index_follows_uploads_and_deletes(client, container, listing_redis, monkeypatch):
+    monkeypatch.setattr(settings, "storage_list_cache", True)
+    container.blobs["a"] = b"x"
+    assert _list_all(client) == ["a"]
+
+    # changes made behind the index's back are not visible until it expires
+    container.blobs["hidden"] = b"x"
+    client.post("/storage/files", files={"file": ("b", b"y", "text/plain")})
+    client.delete("/storage/files/a")
+
+    assert _list_all(client) == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_listing_index_served_while_refreshed_in_background(container, listing_redis):
+    backend = AzureBlobBackend()
+    container.blobs["a"] = b"x"
+    assert [info.name for info in (await listing_index.page(backend, None, 10, None))[0]] == ["a"]
+
+    container.blobs["b"] = b"x"
+    await listing_redis.set(listing_index.built_key, 0)
+
+    assert [info.name for info in (await listing_index.page(backend, None, 10, None))[0]] == ["a"]
+    await listing_index._refresh
+    assert [info.name for info in (await listing_index.page(backend, None, 10, None))[0]] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_listing_index_rebuild_keeps_concurrent_changes(container, listing_redis):
+    backend = AzureBlobBackend()
+    container.blobs.update({"a": b"x", "b": b"x"})
+    list_page = backend.list_page
+
+    async def list_page_with_changes(*args):
+        page = await list_page(*args)
+        await listing_index.add(FileInfo("c", 1, '"c"', None, None))
+        await listing_index.remove("a")
+        return page
+
+    backend.list_page = list_page_with_changes
+    assert await listing_index.rebuild(backend)
+
+    assert [info.name for info in (await listing_index.page(backend, None, 10, None))[0]] == ["b", "c"]
+    assert not await listing_redis.exists(listing_index.changes_key)
+
+
+@pytest.mark.asyncio
+async def test_listing_index_rebuild_discarded_after_losing_lock(container, listing_redis):
+    backend = AzureBlobBackend()
+    container.blobs["a"] = b"x"
+    assert await listing_index.rebuild(backend)
+    container.blobs["b"] = b"x"
+    list_page = backend.list_page
+    other = {}
+
+    async def slow_list_page(*args):
+        # the scan outlives its lock and another worker starts a rebuild of its own
+        await listing_redis.delete(f"lock:{listing_index.names_key}")
+        other["lock"] = await cache_lock_acquire(listing_index.names_key)
+        await listing_redis.zadd(f"{listing_index.names_key}:rebuild:{other['lock']}", {"a": 0})
+        return await list_page(*args)
+
+    backend.list_page = slow_list_page
+    assert not await listing_index.rebuild(backend)
+
+    assert await listing_redis.zrange(listing_index.names_key, 0, -1) == [b"a"]
+    assert await listing_redis.exists(f"{listing_index.names_key}:rebuild:{other['lock']}")
+    assert await cache_lock_acquire(listing_index.names_key) is None
+
+
+@pytest.mark.asyncio
+async def test_listing_index_token_waits_for_rebuild_elsewhere(container, listing_redis, monkeypatch):
+    monkeypatch.setattr("src.storage.listing.BUILD_POLL_INTERVAL", 0.01)
+    backend = AzureBlobBackend()
+    container.blobs.update({"a": b"x", "b": b"x"})
+    _, token = await listing_index.page(backend, None, 1, None)
+
+    await listing_redis.delete(listing_index.built_key)
+    lock = await cache_lock_acquire(listing_index.names_key)
+    assert await listing_index.page(backend, None, 1, None) is None
+
+    pending = asyncio.create_task(listing_index.page(backend, None, 1, token))
+    await asyncio.sleep(0.05)
+    assert not pending.done()
+    await cache_lock_release(listing_index.names_key, lock)
+
+    files, _ = await pending
+    assert [info.name for info in files] == ["b"]
+
+
+def test_download_missing_file(client, container):
+    assert client.get("/storage/files/missing.txt").status_code == 404
+
+
+def test_download_streams_raw_bytes(client, container):
+    container.blobs["cat.bin"] = bytes(range(256)) * 4
+
+    response = client.get("/storage/files/cat.bin")
+
+    assert response.status_code == 200
+    assert response.content == container.blobs["cat.bin"]
+    assert response.headers["content-length"] == "1024"
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["etag"].startswith('"')
+
+
+def test_download_range_and_conditional_requests(client, container):
+    container.blobs["cat.txt"] = b"0123456789"
+
+    partial = client.get("/storage/files/cat.txt", headers={"Range": "bytes=2-5"})
+    assert partial.status_code == 206
+    assert partial.content == b"2345"
+    assert partial.headers["content-range"] == "bytes 2-5/10"
+
+    etag = partial.headers["etag"]
+    assert client.get("/storage/files/cat.txt", headers={"If-None-Match": etag}).status_code == 304
+
+    unsatisfiable = client.get("/storage/files/cat.txt", headers={"Range": "bytes=10-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "bytes */10"
+
+
+def test_parse_range():
+    assert parse_range(None, 10) is None
+    assert parse_range("bytes=0-", 10) == (0, 9)
+    assert parse_range("bytes=5-100", 10) == (5, 9)
+    assert parse_range("bytes=-3", 10) == (7, 9)
+    assert parse_range("bytes=0-1,4-5", 10) is None
+    assert parse_range("items=0-1", 10) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=10-", 10)
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"a"')
+
+
+def test_local_backend_roundtrip(client, local_storage, tmp_path, fake_redis):
+    response = client.post("/storage/files", files={"file": ("cat.txt", b"0123456789", "text/plain")})
+    assert response.status_code == 200
+    assert (tmp_path / "cat.txt").read_bytes() == b"0123456789"
+    assert [path.name for path in tmp_path.iterdir()] == ["cat.txt"]
+
+    assert [file["name"] for file in client.get("/storage/files").json()["files"]] == ["cat.txt"]
+
+    partial = client.get("/storage/files/cat.txt", headers={"Range": "bytes=-4"})
+    assert partial.status_code == 206
+    assert partial.content == b"6789"
+    assert partial.headers["content-type"].startswith("text/plain")
+
+    assert client.delete("/storage/files/cat.txt").status_code == 200
+    assert client.get("/storage/files/cat.txt").status_code == 404
+
+
+def test_local_backend_resumable_upload(client, local_storage, tmp_path, fake_redis):
+    upload_id = client.post("/storage/uploads", json={"filename": "big.bin"}).json()["upload_id"]
+    client.put(f"/storage/uploads/{upload_id}/blocks/1", content=b"world")
+    client.put(f"/storage/uploads/{upload_id}/blocks/0", content=b"hello ")
+
+    assert client.post(f"/storage/uploads/{upload_id}/commit", json={}).status_code == 200
+    assert (tmp_path / "big.bin").read_bytes() == b"hello world"
+    assert [file["name"] for file in client.get("/storage/files").json()["files"]] == ["big.bin"]
+
+
+@pytest.mark.asyncio
+async def test_local_backend_rejects_paths_outside_root(local_storage):
+    with pytest.raises(FileNotFoundError):
+        await local_storage.get_info("../secret.txt")
+    with pytest.raises(FileNotFoundError):
+        await local_storage.get_info(".uploads/anything")
+
+
+@pytest.mark.asyncio
+async def test_local_stream_uses_zerocopy_send_when_supported(local_storage, tmp_path):
+    (tmp_path / "cat.txt").write_bytes(b"0123456789")
+    stream = await local_storage.open_stream("cat.txt", 2, 5)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "extensions": {ZEROCOPY_SEND: {}}}
+    await FileStreamResponse(stream)(scope, None, send)
+
+    assert messages[1]["type"] == ZEROCOPY_SEND
+    assert (messages[1]["offset"], messages[1]["count"]) == (2, 5)
+    assert stream.file.closed
+
+
+@pytest.mark.asyncio
+async def test_local_backend_list_page(local_storage, tmp_path):
+    for name in ("a/1", "a/2", "a/3", "b"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_bytes(b"x")
+
+    files, token = await local_storage.list_page("a/", 2)
+    assert [info.name for info in files] == ["a/1", "a/2"]
+
+    files, token = await local_storage.list_page("a/", 2, token)
+    assert [info.name for info in files] == ["a/3"]
+    assert token is None